@@ -1,5 +1,10 @@
 from django.core.mail import send_mail
 
+from tasks.queue import task
+
+
+# Queued from the review view; SMTP failures are retried by the worker
+@task
 def send_admin_request_email(email, is_approved):
     subject = "SafeVoice Admin Application Update"
     if is_approved:
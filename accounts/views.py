@@ -12,6 +12,7 @@ from .serializers import (
     CustomTokenObtainPairSerializer,
     AdminAccessRequestSerializer,
 )
+from django.db import transaction
 from django.utils import timezone
 from accounts.permissions import IsSuperUser
 # Register View
@@ -105,25 +106,27 @@ class AdminAccessRequestReviewView(APIView):
 
         user = admin_request.user
 
-        if action == 'approve':
-            admin_request.status = 'approved'
-            user.role = 'admin'
-
-            if admin_request.request_type == 'organization':
-                org, created = Organization.objects.get_or_create(
-                    name=admin_request.organization_name,
-                    defaults={'description': admin_request.organization_description}
-                )
-                user.organization = org
-
-            user.save()
-            send_admin_request_email(user.email, is_approved=True)  # ✅ Send email
-        else:
-            admin_request.status = 'rejected'
-            send_admin_request_email(user.email, is_approved=False)  # ✅ Send rejection email
-
-        admin_request.reviewed_by = request.user
-        admin_request.reviewed_at = timezone.now()
-        admin_request.save()
+        # The email is queued with the decision, so it goes out only if this commits
+        with transaction.atomic():
+            if action == 'approve':
+                admin_request.status = 'approved'
+                user.role = 'admin'
+
+                if admin_request.request_type == 'organization':
+                    org, created = Organization.objects.get_or_create(
+                        name=admin_request.organization_name,
+                        defaults={'description': admin_request.organization_description}
+                    )
+                    user.organization = org
+
+                user.save()
+                send_admin_request_email.enqueue(user.email, is_approved=True)  # ✅ Send email
+            else:
+                admin_request.status = 'rejected'
+                send_admin_request_email.enqueue(user.email, is_approved=False)  # ✅ Send rejection email
+
+            admin_request.reviewed_by = request.user
+            admin_request.reviewed_at = timezone.now()
+            admin_request.save()
 
         return Response({"success": f"Request has been {action}d."})
\ No newline at end of file
@@ -2,16 +2,17 @@
 
 from rest_framework import serializers
 from reports.models import Report, Notification, ReportComment # Assuming these models are accessible from adminpanel
+from reports.serializers import SparseFieldsMixin, EvidenceDerivativesMixin, EvidenceFileField
 from django.contrib.auth import get_user_model
 from django.utils import timezone # Added for last_status_update
 
 User = get_user_model()
 
-class AdminReportSerializer(serializers.ModelSerializer):
+class AdminReportSerializer(SparseFieldsMixin, EvidenceDerivativesMixin, serializers.ModelSerializer):
     status = serializers.ChoiceField(choices=Report.STATUS_CHOICES, required=False)
     internal_notes = serializers.CharField(required=False, allow_blank=True)
     submitted_at = serializers.DateTimeField(read_only=True)
-    file_upload = serializers.FileField(read_only=True)
+    file_upload = EvidenceFileField(read_only=True)
     is_resolved = serializers.BooleanField(read_only=True)
     priority_flag = serializers.BooleanField(required=False)
     submitted_by_username = serializers.CharField(source='submitted_by.username', read_only=True)
@@ -23,9 +24,12 @@ class AdminReportSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'description', 'category', 'status', 'internal_notes',
             'file_upload', 'submitted_at', 'is_resolved', 'priority_flag',
-            'submitted_by', 'submitted_by_username', 'is_anonymous', 'is_premium_report'
+            'submitted_by', 'submitted_by_username', 'is_anonymous', 'is_premium_report',
+            'is_image', 'is_video', 'thumbnail_url', 'preview_url', 'sprite_url', 'media_metadata'
         ]
-        read_only_fields = ['id', 'submitted_at', 'file_upload', 'submitted_by', 'is_resolved', 'is_anonymous', 'is_premium_report']
+        read_only_fields = ['id', 'submitted_at', 'file_upload', 'submitted_by', 'is_resolved', 'is_anonymous', 'is_premium_report', 'is_image', 'is_video']
+        # Encrypted; only decrypted on detail reads or ?expand=description
+        deferred_fields = ['description']
 
     def update(self, instance, validated_data):
         # Update last_status_update and reviewed_by when status changes
@@ -56,9 +60,15 @@ class MonthlyTrendSerializer(serializers.Serializer):
     month = serializers.CharField()
     count = serializers.IntegerField()
 
+class TrendSerializer(serializers.Serializer):
+    period = serializers.DateField()  # first day of the day/week/month
+    count = serializers.IntegerField()
+
 class ReportAnalyticsSerializer(serializers.Serializer):
     total_reports = serializers.IntegerField()
     reports_by_status = serializers.DictField(child=serializers.IntegerField())
     reports_by_category = serializers.DictField(child=serializers.IntegerField())
-    monthly_trends = MonthlyTrendSerializer(many=True)  
-    priority_reports_count = serializers.IntegerField()
\ No newline at end of file
+    monthly_trends = MonthlyTrendSerializer(many=True)  # empty unless granularity is month
+    priority_reports_count = serializers.IntegerField()
+    granularity = serializers.ChoiceField(choices=['day', 'week', 'month'], required=False)
+    trends = TrendSerializer(many=True, required=False)
\ No newline at end of file
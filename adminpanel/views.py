@@ -1,23 +1,35 @@
 from django.shortcuts import render
 from rest_framework.permissions import IsAuthenticated
 from reports.models import Report
+from reports.pagination import ReportCursorPagination
+from reports.serializers import wants_field
+from reports.crypto import iter_decrypted
+from reports.conditional import ConditionalReadMixin
+from reports.digests import queue_status_email
+from reports import analytics
+from reports.cache import get_analytics
 from accounts.models import User  # Adjust if your user model is elsewhere
 from .serializers import AdminReportSerializer, AdminUserSerializer, ReportAnalyticsSerializer
 from .permissions import IsAdminOrPremiumAdmin, IsPremiumAdmin
 from rest_framework import generics, views, status
 from rest_framework.response import Response
-from django.db.models import Count
+from django.db import transaction
 from django.http import HttpResponse
 import csv
 from collections import defaultdict
 from accounts.permissions import IsSuperUser
 # FREE + PREMIUM: View & filter reports
-class AdminReportListView(generics.ListAPIView):
+class AdminReportListView(ConditionalReadMixin, generics.ListAPIView):
     serializer_class = AdminReportSerializer
     permission_classes = [IsAuthenticated, IsAdminOrPremiumAdmin]
+    pagination_class = ReportCursorPagination
 
     def get_queryset(self):
-        queryset = Report.objects.all()
+        # AdminReportSerializer reads submitted_by.username and the evidence derivatives for every row
+        queryset = Report.objects.select_related('submitted_by', 'evidence')
+        if not wants_field(self.request, 'description'):
+            # Skip loading (and decrypting) descriptions the list won't render
+            queryset = queryset.defer('description')
         status_param = self.request.query_params.get('status')
         category_param = self.request.query_params.get('category')
         if status_param:
@@ -26,8 +38,13 @@ class AdminReportListView(generics.ListAPIView):
             queryset = queryset.filter(category=category_param)
         return queryset
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['defer_fields'] = True
+        return context
+
 # FREE + PREMIUM: View report detail
-class AdminReportDetailView(generics.RetrieveAPIView):
+class AdminReportDetailView(ConditionalReadMixin, generics.RetrieveAPIView):
     queryset = Report.objects.all()
     serializer_class = AdminReportSerializer
     permission_classes = [IsAuthenticated, IsAdminOrPremiumAdmin]
@@ -40,38 +57,28 @@ class AdminReportUpdateView(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated, IsAdminOrPremiumAdmin]
     lookup_field = 'id'
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        old_status = serializer.instance.status
+        report = serializer.save()
+        if report.status != old_status:
+            queue_status_email(report, report.status)
+
 # PREMIUM ONLY: Analytics endpoint
 
 class AdminAnalyticsView(views.APIView):
     permission_classes = [IsAuthenticated, IsAdminOrPremiumAdmin]
 
     def get(self, request):
-        reports_by_status_qs = Report.objects.values("status").annotate(count=Count("id"))
-        reports_by_status = {entry["status"]: entry["count"] for entry in reports_by_status_qs}
-
-        reports_by_category_qs = Report.objects.values("category").annotate(count=Count("id"))
-        reports_by_category = {entry["category"]: entry["count"] for entry in reports_by_category_qs}
-
-        monthly_trends_qs = Report.objects.extra(
-            select={'month': "DATE_TRUNC('month', submitted_at)"}
-        ).values('month').annotate(count=Count('id')).order_by('month')
-
-        monthly_trends = [
-            {"month": entry["month"].strftime("%Y-%m"), "count": entry["count"]}
-            for entry in monthly_trends_qs
-        ]
+        # ?from=&to=&granularity=day|week|month&tz=; all reports by default
+        params = analytics.parse_params(request.query_params)
 
-        data = {
-            "total_reports": Report.objects.count(),
-            "reports_by_status": reports_by_status,
-            "reports_by_category": reports_by_category,
-            "monthly_trends": monthly_trends,
-            "priority_reports_count": Report.objects.filter(priority_flag=True).count(),
-        }
+        def build():
+            data = analytics.compute(**params)
+            data["monthly_trends"] = analytics.monthly_trends(data)
+            return ReportAnalyticsSerializer(instance=data).data
 
-        
-        serializer = ReportAnalyticsSerializer(instance=data)
-        return Response(serializer.data)
+        return Response(get_analytics(analytics.cache_name("adminpanel", params), build))
 
 
 # PREMIUM ONLY: Export reports (CSV)
@@ -83,13 +90,14 @@ class ExportReportsView(views.APIView):
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="reports.csv"'
         writer = csv.writer(response)
-        writer.writerow(['ID', 'Title', 'Category', 'Status', 'Created'])
+        writer.writerow(['ID', 'Title', 'Description', 'Category', 'Status', 'Created'])
 
-        for report in reports:
+        # Descriptions are decrypted in bulk rather than row by row
+        for report, description in iter_decrypted(reports, 'description'):
             writer.writerow([
                 report.id,
                 report.title,
-                report.description,
+                description,
                 report.category,
                 report.status,
                 report.submitted_at.strftime('%Y-%m-%d %H:%M:%S')])
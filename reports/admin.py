@@ -1,5 +1,8 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import User, Report, Organization, AdminAccessRequest, Notification, ReportComment # Import all models
+from .cache import invalidate_token_status
+from .counters import update_report_status, update_reports
 
 # Register your models here.
 admin.site.register(User)
@@ -16,7 +19,9 @@ class ReportAdmin(admin.ModelAdmin):
         'submitted_at', 'last_status_update', 'is_anonymous_display', 'reviewed_by'
     )
     list_filter = ('category', 'status', 'is_premium', 'priority_flag', 'is_anonymous', 'submitted_at')
-    search_fields = ('title', 'description', 'token', 'submitted_by__username')
+    # description is encrypted, so a SQL LIKE can't match it. Matching it would mean
+    # decrypting the whole table on every search, so it is deliberately not searchable.
+    search_fields = ('title', 'token', 'submitted_by__username')
     raw_id_fields = ('submitted_by', 'reviewed_by') # Use raw_id_fields for FKs to User
     date_hierarchy = 'submitted_at'
     readonly_fields = ('token', 'submitted_at', 'last_status_update') # Make token read-only
@@ -37,6 +42,10 @@ class ReportAdmin(admin.ModelAdmin):
 
     actions = ['mark_as_resolved', 'mark_as_escalated', 'set_priority_flag'] # Add admin actions
 
+    def get_queryset(self, request):
+        # The changelist never shows the description; don't decrypt it per row
+        return super().get_queryset(request).defer('description')
+
     def is_anonymous_display(self, obj):
         return obj.is_anonymous
     is_anonymous_display.short_description = "Anonymous"
@@ -44,16 +53,19 @@ class ReportAdmin(admin.ModelAdmin):
 
 
     def mark_as_resolved(self, request, queryset):
-        updated_count = queryset.update(status='resolved', reviewed_by=request.user, resolution_notes=f"Resolved by admin {request.user.username}")
+        invalidate_token_status(*queryset.values_list('token', flat=True))
+        updated_count = update_report_status(queryset, 'resolved', reviewed_by=request.user, resolution_notes=f"Resolved by admin {request.user.username}", updated_at=timezone.now())
         self.message_user(request, f'{updated_count} reports marked as resolved.')
     mark_as_resolved.short_description = "Mark selected reports as Resolved"
 
     def mark_as_escalated(self, request, queryset):
-        updated_count = queryset.update(status='escalated', reviewed_by=request.user, priority_flag=True)
+        invalidate_token_status(*queryset.values_list('token', flat=True))
+        updated_count = update_report_status(queryset, 'escalated', reviewed_by=request.user, priority_flag=True, updated_at=timezone.now())
         self.message_user(request, f'{updated_count} reports marked as escalated and priority flagged.')
     mark_as_escalated.short_description = "Mark selected reports as Escalated (and Priority)"
 
     def set_priority_flag(self, request, queryset):
-        updated_count = queryset.update(priority_flag=True)
+        invalidate_token_status(*queryset.values_list('token', flat=True))
+        updated_count = update_reports(queryset, priority_flag=True, updated_at=timezone.now())
         self.message_user(request, f'{updated_count} reports marked as high priority.')
     set_priority_flag.short_description = "Set priority flag for selected reports"
\ No newline at end of file
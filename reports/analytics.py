@@ -0,0 +1,176 @@
+# reports/analytics.py
+#
+# The query engine behind both admin analytics endpoints. Every breakdown
+# (status, category, premium, anonymous, priority) is a conditional aggregate
+# in one GROUP BY pass over Trunc()'d periods, so the same code runs on SQLite
+# and Postgres. Ranges in TIME_ZONE are answered from the ReportDailyStats
+# rollup; another time zone moves the day boundaries, so those scan the
+# Report rows in range instead (still a single query).
+
+import datetime
+import zoneinfo
+
+from django.conf import settings
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from .models import Report, ReportDailyStats
+
+GRANULARITIES = ('day', 'week', 'month')
+# Dates outside [EARLIEST_DATE, today + LATEST_AHEAD] are rejected, and so are
+# ranges with more than MAX_PERIODS[granularity] periods in ``trends``
+EARLIEST_DATE = datetime.date(2000, 1, 1)
+LATEST_AHEAD = datetime.timedelta(days=366)
+MAX_PERIODS = {'day': 366, 'week': 260, 'month': 120}
+
+
+def parse_params(params):
+    """Read ``from``, ``to`` (inclusive dates), ``granularity`` and ``tz`` from query params."""
+    granularity = params.get('granularity', 'month')
+    if granularity not in GRANULARITIES:
+        raise ValidationError({'granularity': f"Must be one of {', '.join(GRANULARITIES)}."})
+    try:
+        tz = zoneinfo.ZoneInfo(params['tz']) if params.get('tz') else timezone.get_default_timezone()
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise ValidationError({'tz': 'Unknown time zone.'})
+
+    bounds = {}
+    for name in ('from', 'to'):
+        raw = params.get(name)
+        try:
+            bounds[name] = parse_date(raw) if raw else None
+        except ValueError:
+            bounds[name] = None
+        if raw and bounds[name] is None:
+            raise ValidationError({name: 'Expected a date (YYYY-MM-DD).'})
+    latest = timezone.localdate(timezone=tz) + LATEST_AHEAD
+    for name, day in bounds.items():
+        if day and not EARLIEST_DATE <= day <= latest:
+            raise ValidationError({name: f'Must be between {EARLIEST_DATE} and {latest}.'})
+    if bounds['from'] and bounds['to'] and bounds['from'] > bounds['to']:
+        raise ValidationError({'from': "Must not be after 'to'."})
+    if bounds['from']:
+        # Without 'to' trends stop at the latest report (today at most); without 'from'
+        # they start at the earliest one
+        end = bounds['to'] or timezone.localdate(timezone=tz)
+        if period_count(bounds['from'], end, granularity) > MAX_PERIODS[granularity]:
+            raise ValidationError({'from': f"At most {MAX_PERIODS[granularity]} {granularity}s per request."})
+    return {'start': bounds['from'], 'end': bounds['to'], 'granularity': granularity, 'tz': tz}
+
+
+def cache_name(view, params, **extra):
+    """A cache key fragment identifying one analytics request."""
+    parts = [view, params['start'], params['end'], params['granularity'], params['tz'].key]
+    parts += [value for _, value in sorted(extra.items())]
+    return ':'.join(str(part) for part in parts)
+
+
+def period_start(day, granularity):
+    if granularity == 'week':
+        return day - datetime.timedelta(days=day.weekday())  # Monday, as Trunc('week') does
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_period(day, granularity):
+    if granularity == 'month':
+        return (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return day + datetime.timedelta(days=7 if granularity == 'week' else 1)
+
+
+def period_count(start, end, granularity):
+    """How many periods ``trends`` has for the inclusive range ``start``..``end``."""
+    if granularity == 'month':
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    days = (period_start(end, granularity) - period_start(start, granularity)).days
+    return days // (7 if granularity == 'week' else 1) + 1
+
+
+def months_back(count, tz):
+    """First day of the month ``count - 1`` months before the current one in ``tz``."""
+    month = timezone.localdate(timezone=tz).replace(day=1)
+    for _ in range(count - 1):
+        month = (month - datetime.timedelta(days=1)).replace(day=1)
+    return month
+
+
+def _source(start, end, granularity, tz):
+    """The rows to aggregate, their period expression, and how to count them."""
+    if getattr(tz, 'key', None) == settings.TIME_ZONE:
+        queryset = ReportDailyStats.objects.all()
+        if start:
+            queryset = queryset.filter(day__gte=start)
+        if end:
+            queryset = queryset.filter(day__lte=end)
+        period = Trunc('day', granularity, output_field=DateField())
+        return queryset, period, lambda condition=None: Sum('count', filter=condition, default=0)
+
+    def midnight(day):
+        return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min), tz)
+
+    queryset = Report.objects.all()
+    if start:
+        queryset = queryset.filter(submitted_at__gte=midnight(start))
+    if end:
+        queryset = queryset.filter(submitted_at__lt=midnight(end + datetime.timedelta(days=1)))
+    period = Trunc('submitted_at', granularity, output_field=DateField(), tzinfo=tz)
+    return queryset, period, lambda condition=None: Count('id', filter=condition)
+
+
+def compute(start=None, end=None, granularity='month', tz=None, trends_since=None):
+    """
+    Report totals and per-period counts for submissions between ``start``
+    and ``end`` (inclusive dates in ``tz``; either may be None for open-ended).
+    ``trends`` covers every period in the range, empty ones included, or
+    only those from ``trends_since`` on when given.
+    """
+    tz = tz or timezone.get_default_timezone()
+    queryset, period, measure = _source(start, end, granularity, tz)
+
+    breakdowns = {'total': measure(), 'premium': measure(Q(is_premium=True)),
+                  'anonymous': measure(Q(is_anonymous=True)), 'priority': measure(Q(priority_flag=True))}
+    for value, _ in Report.STATUS_CHOICES:
+        breakdowns[f'status_{value}'] = measure(Q(status=value))
+    for value, _ in Report.CATEGORY_CHOICES:
+        breakdowns[f'category_{value}'] = measure(Q(category=value))
+    rows = list(queryset.annotate(period=period).values('period').annotate(**breakdowns).order_by('period'))
+
+    totals = {name: sum(row[name] for row in rows) for name in breakdowns}
+    per_period = {row['period']: row['total'] for row in rows if row['total']}
+    trends = []
+    first = trends_since or start
+    if per_period or (first and end):
+        current = period_start(first or min(per_period), granularity)
+        last = period_start(end or max(per_period), granularity)
+        while current <= last:
+            trends.append({'period': current, 'count': per_period.get(current, 0)})
+            current = next_period(current, granularity)
+
+    def nonzero(prefix, choices):
+        counts = {value: totals[f'{prefix}_{value}'] for value, _ in choices}
+        return {value: count for value, count in counts.items() if count}
+
+    return {
+        'total_reports': totals['total'],
+        'reports_by_status': nonzero('status', Report.STATUS_CHOICES),
+        'reports_by_category': nonzero('category', Report.CATEGORY_CHOICES),
+        'premium_vs_free_reports': {True: totals['premium'], False: totals['total'] - totals['premium']},
+        'anonymous_vs_identified_reports': {
+            value: count for value, count in
+            ((True, totals['anonymous']), (False, totals['total'] - totals['anonymous'])) if count
+        },
+        'priority_reports_count': totals['priority'],
+        'granularity': granularity,
+        'trends': trends,
+    }
+
+
+def monthly_trends(result):
+    """The ``monthly_trends`` list the analytics serializer has always returned (month granularity only)."""
+    if result['granularity'] != 'month':
+        return []
+    return [{'month': entry['period'].strftime('%Y-%m'), 'count': entry['count']} for entry in result['trends']]
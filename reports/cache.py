@@ -0,0 +1,123 @@
+# reports/cache.py
+
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Report
+
+# Changes whenever the analytics numbers may have; cached payloads carry the version they were built from
+ANALYTICS_VERSION_KEY = 'analytics:version'
+
+# Stored for tokens that don't exist, so repeat misses are answered from the cache.
+TOKEN_MISS = 'missing'
+
+
+def token_cache_key(token):
+    return f'report-token:{token}'
+
+
+def get_token_status(token):
+    """
+    Return the public status payload for a report token, or None if there is no such report.
+
+    Hits are cached for REPORT_TOKEN_CACHE_TTL seconds and misses for
+    REPORT_TOKEN_MISS_TTL seconds. Malformed tokens never touch the cache or database.
+    """
+    try:
+        token = uuid.UUID(str(token))
+    except ValueError:
+        return None
+
+    key = token_cache_key(token)
+    cached = cache.get(key)
+    if cached == TOKEN_MISS:
+        return None
+    if cached is not None:
+        return cached
+
+    report = (
+        Report.objects.only('id', 'title', 'category', 'status', 'submitted_at', 'priority_flag', 'file_upload')
+        .filter(token=token)
+        .first()
+    )
+    if report is None:
+        cache.set(key, TOKEN_MISS, settings.REPORT_TOKEN_MISS_TTL)
+        return None
+
+    payload = {
+        'id': report.id,
+        'title': report.title,
+        'category': report.category,
+        'status': report.status,
+        'submitted_at': report.submitted_at,
+        'priority_flag': report.priority_flag,
+        'file_upload_url': report.file_upload.url if report.file_upload else None,
+    }
+    cache.set(key, payload, settings.REPORT_TOKEN_CACHE_TTL)
+    return payload
+
+
+def invalidate_token_status(*tokens):
+    """
+    Drop cached payloads once the surrounding transaction commits, so a
+    concurrent reader can't re-cache the pre-commit state.
+    """
+    keys = [token_cache_key(token) for token in tokens]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def analytics_version():
+    version = cache.get(ANALYTICS_VERSION_KEY)
+    if version is None:
+        cache.add(ANALYTICS_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(ANALYTICS_VERSION_KEY)
+    return version
+
+
+def invalidate_analytics():
+    """Retire every cached analytics payload once the surrounding transaction commits."""
+    transaction.on_commit(lambda: cache.set(ANALYTICS_VERSION_KEY, uuid.uuid4().hex, None))
+
+
+def get_analytics(name, compute):
+    """
+    Return the analytics payload cached under ``name``, calling ``compute()``
+    to build it when it is missing or older than the current version.
+
+    Only the worker holding the ``cache.add`` lock recomputes; while it does,
+    others get the stale payload, or wait up to ANALYTICS_CACHE_WAIT seconds
+    for the fresh one when there is none.
+    """
+    key = f'analytics:{name}'
+    lock_key = f'{key}:lock'
+    version = analytics_version()
+    entry = cache.get(key)
+    if entry is not None and entry['version'] == version:
+        return entry['data']
+
+    deadline = time.monotonic() + settings.ANALYTICS_CACHE_WAIT
+    while not cache.add(lock_key, True, settings.ANALYTICS_CACHE_LOCK_TIMEOUT):
+        if entry is not None:
+            return entry['data']
+        if time.monotonic() >= deadline:
+            # The lock holder is taking too long (or died); answer without caching
+            return compute()
+        time.sleep(0.05)
+        entry = cache.get(key)
+
+    try:
+        # The previous holder may have just stored it
+        entry = cache.get(key)
+        if entry is not None and entry['version'] == version:
+            return entry['data']
+        # Tagged with the version read before computing, so a write landing meanwhile still retires it
+        data = compute()
+        cache.set(key, {'version': version, 'data': data}, settings.ANALYTICS_CACHE_TTL)
+    finally:
+        cache.delete(lock_key)
+    return data
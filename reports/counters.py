@@ -0,0 +1,175 @@
+# reports/counters.py
+#
+# Badge numbers (unread notifications, reports per status, comment counts)
+# served from the Counter table instead of counting rows per request. Signal
+# handlers move the counts with F() updates in the same transaction as the
+# change; code that bypasses signals (queryset.update) must call the helpers
+# here itself. `manage.py rebuild_counters` recomputes everything from scratch.
+
+import threading
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from . import rollups
+from .models import Counter, Notification, Report, ReportComment
+
+ADMIN_SCOPE = 'admin'
+UNREAD = 'notifications_unread'
+COMMENTS = 'comments'
+INTERNAL_COMMENTS = 'comments_internal'
+
+
+_local = threading.local()
+
+
+@contextmanager
+def adjusted_by_caller():
+    """
+    Inside the block the signal handlers leave counters alone, for bulk
+    operations that apply one combined delta themselves (e.g. a batch delete,
+    which still sends post_delete per row).
+    """
+    previous = getattr(_local, 'suspended', False)
+    _local.suspended = True
+    try:
+        yield
+    finally:
+        _local.suspended = previous
+
+
+def signals_suspended():
+    return getattr(_local, 'suspended', False)
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def report_scope(report_id):
+    return f'report:{report_id}'
+
+
+def status_name(status):
+    return f'reports:{status}'
+
+
+def bump(scope, name, delta=1):
+    """Atomically add ``delta`` to a counter, creating it on first use."""
+    if not delta:
+        return
+    if Counter.objects.filter(scope=scope, name=name).update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            Counter.objects.create(scope=scope, name=name, value=delta)
+    except IntegrityError:
+        # Another transaction created it first
+        Counter.objects.filter(scope=scope, name=name).update(value=F('value') + delta)
+
+
+def count_report(submitted_by_id, status, delta):
+    bump(ADMIN_SCOPE, status_name(status), delta)
+    if submitted_by_id:
+        bump(user_scope(submitted_by_id), status_name(status), delta)
+
+
+def update_report_status(queryset, status, **fields):
+    """``queryset.update(status=status, ...)`` that keeps the status counters and the analytics rollup right."""
+    with transaction.atomic():
+        moved = list(
+            queryset.exclude(status=status).values('submitted_by', 'status').annotate(n=Count('id')).order_by()
+        )
+        rollups.move(queryset, status=status, **fields)
+        updated = queryset.update(status=status, **fields)
+        for group in moved:
+            count_report(group['submitted_by'], group['status'], -group['n'])
+            count_report(group['submitted_by'], status, group['n'])
+    return updated
+
+
+def update_reports(queryset, **fields):
+    """``queryset.update(**fields)`` for changes other than status; keeps the analytics rollup right."""
+    with transaction.atomic():
+        rollups.move(queryset, **fields)
+        return queryset.update(**fields)
+
+
+def mark_notifications_read(user, queryset):
+    """Mark ``user``'s notifications in ``queryset`` read with one UPDATE; returns how many were unread."""
+    with transaction.atomic():
+        updated = queryset.filter(user=user, is_read=False).update(is_read=True, updated_at=timezone.now())
+        bump(user_scope(user.pk), UNREAD, -updated)
+    return updated
+
+
+def delete_notifications(user, queryset):
+    """Delete ``user``'s notifications in ``queryset``, keeping the unread count right. Returns the number deleted."""
+    with transaction.atomic():
+        rows = list(queryset.filter(user=user).select_for_update().values_list('pk', 'is_read'))
+        if not rows:
+            return 0
+        with adjusted_by_caller():
+            Notification.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
+        bump(user_scope(user.pk), UNREAD, -sum(1 for _, is_read in rows if not is_read))
+    return len(rows)
+
+
+def read_counts(user, report_ids=()):
+    """
+    Everything the badges need, in one indexed query: the user's unread
+    notifications and reports per status, admin-wide status totals for
+    admins, and comment counts for ``report_ids`` the user may see.
+    """
+    scopes = [user_scope(user.pk)]
+    if user.is_admin():
+        scopes.append(ADMIN_SCOPE)
+    else:
+        report_ids = Report.objects.filter(pk__in=report_ids, submitted_by=user).values_list('pk', flat=True)
+    scopes += [report_scope(report_id) for report_id in report_ids]
+
+    values = {(row.scope, row.name): row.value for row in Counter.objects.filter(scope__in=scopes)}
+
+    def statuses(scope):
+        return {key: values.get((scope, status_name(key)), 0) for key, _ in Report.STATUS_CHOICES}
+
+    counts = {
+        'notifications_unread': values.get((user_scope(user.pk), UNREAD), 0),
+        'reports': statuses(user_scope(user.pk)),
+    }
+    if user.is_admin():
+        counts['admin'] = statuses(ADMIN_SCOPE)
+    if report_ids:
+        counts['comments'] = {
+            report_id: values.get((report_scope(report_id), COMMENTS), 0)
+            + (values.get((report_scope(report_id), INTERNAL_COMMENTS), 0) if user.is_admin() else 0)
+            for report_id in report_ids
+        }
+    return counts
+
+
+def rebuild():
+    """Recompute every counter from the source tables. Returns the number of counters written."""
+    rows = {}
+    for row in Notification.objects.filter(is_read=False).values('user').annotate(n=Count('id')).order_by():
+        rows[(user_scope(row['user']), UNREAD)] = row['n']
+    for row in Report.objects.values('submitted_by', 'status').annotate(n=Count('id')).order_by():
+        name = status_name(row['status'])
+        rows[(ADMIN_SCOPE, name)] = rows.get((ADMIN_SCOPE, name), 0) + row['n']
+        if row['submitted_by']:
+            rows[(user_scope(row['submitted_by']), name)] = row['n']
+    for row in ReportComment.objects.values('report').annotate(
+        public=Count('id', filter=Q(is_internal=False)), internal=Count('id', filter=Q(is_internal=True)),
+    ).order_by():
+        rows[(report_scope(row['report']), COMMENTS)] = row['public']
+        rows[(report_scope(row['report']), INTERNAL_COMMENTS)] = row['internal']
+
+    with transaction.atomic():
+        Counter.objects.all().delete()
+        Counter.objects.bulk_create(
+            [Counter(scope=scope, name=name, value=value) for (scope, name), value in rows.items() if value],
+            batch_size=1000,
+        )
+    return len(rows)
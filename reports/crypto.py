@@ -0,0 +1,138 @@
+# reports/crypto.py
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import os
+
+import cryptography.fernet
+from django.conf import settings
+from django.db.models import ExpressionWrapper, F, QuerySet, TextField
+
+
+def build_crypter(keys):
+    """Build the same MultiFernet that encrypted_model_fields uses for FIELD_ENCRYPTION_KEY."""
+    if not isinstance(keys, (list, tuple)):
+        keys = [keys]
+    return cryptography.fernet.MultiFernet([cryptography.fernet.Fernet(key) for key in keys])
+
+
+@lru_cache(maxsize=1)
+def get_crypter():
+    return build_crypter(settings.FIELD_ENCRYPTION_KEY)
+
+
+def decrypt_value(crypter, value):
+    # Mirrors EncryptedMixin.to_python: values that are not valid tokens
+    # (e.g. rows written before the field was encrypted) pass through as-is.
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    try:
+        return crypter.decrypt(value.encode('utf-8')).decode('utf-8')
+    except cryptography.fernet.InvalidToken:
+        return value
+
+
+# --- Process pool workers ---
+# Each worker builds its cipher once in the initializer and reuses it for every chunk.
+_worker_crypter = None
+
+
+def _init_worker(keys):
+    global _worker_crypter
+    _worker_crypter = build_crypter(keys)
+
+
+def _decrypt_chunk(values):
+    return [decrypt_value(_worker_crypter, value) for value in values]
+
+
+def ciphertexts(queryset, field='description'):
+    """
+    Return the raw stored tokens for ``field`` without decrypting them.
+
+    Re-typing the column as a plain TextField keeps the encrypted field's
+    from_db_value out of the way.
+    """
+    return queryset.annotate(
+        _ciphertext=ExpressionWrapper(F(field), output_field=TextField())
+    ).values_list('_ciphertext', flat=True)
+
+
+class BulkDecryptor:
+    """
+    Decrypts many tokens with a single cipher instance.
+
+    Batches smaller than ``threshold`` are decrypted in-process; larger ones
+    are split into chunks and fanned out to a process pool, which is created
+    lazily and reused until ``close()``. Results are always returned in input order.
+    """
+
+    def __init__(self, workers=None, threshold=None, chunk_size=None):
+        self.workers = workers or settings.BULK_DECRYPT_WORKERS or os.cpu_count() or 1
+        self.threshold = threshold or settings.BULK_DECRYPT_PROCESS_THRESHOLD
+        self.chunk_size = chunk_size or settings.BULK_DECRYPT_CHUNK_SIZE
+        self._executor = None
+
+    def decrypt(self, values):
+        values = list(values)
+        if self.workers < 2 or len(values) < self.threshold:
+            crypter = get_crypter()
+            return [decrypt_value(crypter, value) for value in values]
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(settings.FIELD_ENCRYPTION_KEY,),
+            )
+        chunks = [values[i:i + self.chunk_size] for i in range(0, len(values), self.chunk_size)]
+        plaintexts = []
+        for chunk in self._executor.map(_decrypt_chunk, chunks):
+            plaintexts.extend(chunk)
+        return plaintexts
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def bulk_decrypt(values, field='description'):
+    """
+    Decrypt a queryset's ``field`` column, or an iterable of tokens, in order.
+    """
+    if isinstance(values, QuerySet):
+        values = ciphertexts(values, field)
+    with BulkDecryptor() as decryptor:
+        return decryptor.decrypt(values)
+
+
+def iter_decrypted(queryset, field='description', batch_size=None):
+    """
+    Yield ``(instance, plaintext)`` pairs for a queryset.
+
+    Instances are loaded with ``field`` deferred and the raw tokens are
+    decrypted in batches through one BulkDecryptor, so memory stays bounded
+    by ``batch_size`` and no row is decrypted through the field descriptor.
+    """
+    batch_size = batch_size or settings.BULK_DECRYPT_BATCH_SIZE
+    rows = queryset.defer(field).annotate(
+        _ciphertext=ExpressionWrapper(F(field), output_field=TextField())
+    )
+    with BulkDecryptor() as decryptor:
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield from zip(batch, decryptor.decrypt(row._ciphertext for row in batch))
+                batch = []
+        if batch:
+            yield from zip(batch, decryptor.decrypt(row._ciphertext for row in batch))
@@ -0,0 +1,144 @@
+# reports/digests.py
+#
+# Status-change emails are not sent one per change. Each change is recorded
+# as a PendingStatusEmail; once a submitter's oldest pending change is
+# EMAIL_DIGEST_WINDOW seconds old, everything pending for them goes out as one
+# digest. Digests are sent EMAIL_DIGEST_BATCH_SIZE at a time over a single SMTP
+# connection by the deliver_status_digests task.
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from tasks.queue import is_queued, task
+
+from .models import PendingStatusEmail
+
+logger = logging.getLogger(__name__)
+
+FROM_EMAIL = 'no-reply@safevoice.com'
+
+
+def digest_window():
+    # Eager tasks run as soon as they are scheduled, so there is nothing to wait for
+    return timedelta(seconds=0 if settings.TASKS_EAGER else settings.EMAIL_DIGEST_WINDOW)
+
+
+def queue_status_email(report, status):
+    """Record a status change for the submitter's next digest. Call inside the update's transaction."""
+    user = report.submitted_by
+    if user is None or not user.email:
+        return
+    PendingStatusEmail.objects.create(user=user, report=report, status=status)
+    if not is_queued(deliver_status_digests):
+        deliver_status_digests.schedule(timezone.now() + digest_window())
+
+
+def build_digest(user, changes):
+    """One message for all of a user's pending changes, listing each report's latest status."""
+    latest = {}
+    for change in changes:
+        latest[change.report_id] = change
+    if len(latest) == 1:
+        report = next(iter(latest.values())).report
+        subject = f"Your report '{report.title}' status has been updated!"
+    else:
+        subject = f"{len(latest)} of your reports have new statuses"
+    lines = [f"- '{change.report.title}': {change.status}" for change in latest.values()]
+    body = (
+        f"Hey,\n\n"
+        f"{'Your report has' if len(latest) == 1 else 'Some of your reports have'} changed status:\n\n"
+        + "\n".join(lines)
+        + "\n\nThanks for keeping us informed!\n"
+        f"— The SafeVoice Team"
+    )
+    return EmailMessage(subject, body, FROM_EMAIL, [user.email])
+
+
+@task
+def deliver_status_digests():
+    """
+    Send every digest that is due, in batches over one SMTP connection.
+
+    Each batch's rows are claimed in a short transaction and sent after it
+    commits, so no row locks are held over the SMTP round-trip. Sent rows are
+    deleted; a failed send releases the claim, leaving them pending for the
+    task's retry. Claims older than TASKS_LOCK_TIMEOUT belong to a run that
+    died and are taken over (those changes may be emailed twice).
+    """
+    cutoff = timezone.now() - digest_window()
+    due_users = list(
+        PendingStatusEmail.objects.values('user')
+        .annotate(first=Min('created_at'))
+        .filter(first__lte=cutoff)
+        .order_by('first')
+        .values_list('user', flat=True)
+    )
+    batch_size = settings.EMAIL_DIGEST_BATCH_SIZE
+    totals = {'batches': 0, 'messages': 0, 'changes': 0}
+
+    if due_users:
+        with get_connection(fail_silently=False) as connection:
+            for start in range(0, len(due_users), batch_size):
+                if start and settings.EMAIL_DIGEST_BATCH_PAUSE:
+                    # Stay under the provider's sending rate between batches
+                    time.sleep(settings.EMAIL_DIGEST_BATCH_PAUSE)
+                stats = _send_batch(connection, due_users[start:start + batch_size])
+                totals['batches'] += 1
+                totals['messages'] += stats['messages']
+                totals['changes'] += stats['changes']
+
+    _schedule_next()
+    return totals
+
+
+def _claim(user_ids):
+    """Mark the batch's unclaimed (or abandoned) rows as ours and return them."""
+    now = timezone.now()
+    abandoned = now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT)
+    with transaction.atomic():
+        changes = list(
+            PendingStatusEmail.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=abandoned), user__in=user_ids)
+            .select_related('user', 'report')
+            .order_by('user_id', 'created_at')
+        )
+        PendingStatusEmail.objects.filter(pk__in=[change.pk for change in changes]).update(claimed_at=now)
+    return changes, now
+
+
+def _send_batch(connection, user_ids):
+    started = time.monotonic()
+    changes, claimed_at = _claim(user_ids)
+    claimed = PendingStatusEmail.objects.filter(pk__in=[change.pk for change in changes], claimed_at=claimed_at)
+    by_user = {}
+    for change in changes:
+        by_user.setdefault(change.user_id, []).append(change)
+    messages = [build_digest(group[0].user, group) for group in by_user.values()]
+    try:
+        sent = connection.send_messages(messages) if messages else 0
+    except Exception:
+        claimed.update(claimed_at=None)
+        raise
+    claimed.delete()
+
+    stats = {'messages': sent or 0, 'changes': len(changes)}
+    logger.info(
+        "Status digest batch: %d recipients, %d messages sent, %d changes, %.3fs",
+        len(by_user), stats['messages'], stats['changes'], time.monotonic() - started,
+        extra={'digest_batch': dict(stats, recipients=len(by_user))},
+    )
+    return stats
+
+
+def _schedule_next():
+    # Changes that weren't due yet need a run of their own once they are
+    oldest = PendingStatusEmail.objects.order_by('created_at').values_list('created_at', flat=True).first()
+    if oldest is not None and not is_queued(deliver_status_digests):
+        deliver_status_digests.schedule(max(oldest + digest_window(), timezone.now()))
@@ -0,0 +1,105 @@
+# reports/evidence.py
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import invalidate_token_status
+from .models import EvidenceBlob, Report
+from .storage import evidence_storage
+
+
+def blob_for_name(name):
+    """Return the EvidenceBlob row for a stored file name, creating it if needed."""
+    digest = evidence_storage.digest_from_name(name)
+    if digest is None:
+        # Legacy per-upload files (reports/<user>/<uuid>_name) aren't shared
+        return None
+    blob, _ = EvidenceBlob.objects.get_or_create(
+        file=name, defaults={'sha256': digest, 'size': evidence_storage.size(name)}
+    )
+    return blob
+
+
+def rename_blob(blob, new_name, **fields):
+    """
+    Point a blob, and every report using it, at ``new_name``.
+
+    If another blob row already owns that name (e.g. a concurrent upload of
+    the same bytes), the references are merged into it instead. Returns the
+    blob that now owns ``new_name``. Callers move or write the file itself.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # Cached by-token statuses carry the file URL
+        invalidate_token_status(*Report.objects.filter(evidence=blob).values_list('token', flat=True))
+        existing = EvidenceBlob.objects.select_for_update().filter(file=new_name).exclude(pk=blob.pk).first()
+        if existing is not None:
+            Report.objects.filter(evidence=blob).update(evidence=existing, file_upload=new_name, updated_at=now)
+            EvidenceBlob.objects.filter(pk=existing.pk).update(ref_count=F('ref_count') + blob.ref_count)
+            blob.delete()
+            return existing
+        Report.objects.filter(evidence=blob).update(file_upload=new_name, updated_at=now)
+        blob.file.name = new_name
+        for field, value in fields.items():
+            setattr(blob, field, value)
+        blob.save(update_fields=['file', *fields])
+        return blob
+
+
+def acquire_blob(blob_id):
+    EvidenceBlob.objects.filter(pk=blob_id).update(ref_count=F('ref_count') + 1)
+
+
+def release_blob(blob_id):
+    EvidenceBlob.objects.filter(pk=blob_id, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+    transaction.on_commit(lambda: purge_blob(blob_id))
+
+
+def purge_blob(blob_id):
+    """Delete a blob and its file once no report references it."""
+    with transaction.atomic():
+        # ContentAddressedStorage._claim takes the same row lock before reusing the file
+        name = (
+            EvidenceBlob.objects.select_for_update().filter(pk=blob_id, ref_count=0)
+            .values_list('file', flat=True).first()
+        )
+        if name is None:
+            return
+        EvidenceBlob.objects.filter(pk=blob_id).delete()
+        evidence_storage.delete(name)
+
+
+def purge_name(name):
+    """Delete a stored file that lost its blob row (e.g. after a rename), unless a new upload claimed it."""
+    with transaction.atomic():
+        blob, _ = EvidenceBlob.objects.select_for_update().get_or_create(
+            file=name, defaults={'sha256': evidence_storage.digest_from_name(name) or '', 'size': 0}
+        )
+        if blob.ref_count:
+            return
+        EvidenceBlob.objects.filter(pk=blob.pk).delete()
+        evidence_storage.delete(name)
+
+
+# --- Access links ---
+# <img>/<video> elements can't send the JWT header, so file URLs carry a
+# signed (report, user) pair instead. The view re-checks that the user may
+# still see the report on every request; the signature only names the caller,
+# and expires after EVIDENCE_ACCESS_MAX_AGE so a leaked link doesn't last.
+ACCESS_SALT = 'reports.evidence.access'
+
+
+def make_access_token(report_id, user_id):
+    return signing.dumps([report_id, user_id], salt=ACCESS_SALT, compress=False)
+
+
+def read_access_token(token, report_id):
+    """Return the user id a token was issued to for ``report_id``, or None if it's invalid or expired."""
+    try:
+        signed_report_id, user_id = signing.loads(token, salt=ACCESS_SALT, max_age=settings.EVIDENCE_ACCESS_MAX_AGE)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    return user_id if signed_report_id == report_id else None
@@ -0,0 +1,114 @@
+# reports/extractors.py
+#
+# Media parsing that runs in child processes (see reports/isolation.py).
+# Nothing here may import Django: the children are spawned fresh.
+
+
+def _fourcc(code):
+    code = int(code)
+    return ''.join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip('\x00 ') or None
+
+
+def extract_video(path, sprite_frames=16, sprite_columns=4, sprite_tile_width=160):
+    """
+    Read a video with OpenCV and return its metadata plus JPEG-encoded poster
+    frame and sprite sheet (``sprite_frames`` evenly spaced frames in a grid).
+    """
+    import cv2
+    import numpy as np
+
+    capture = cv2.VideoCapture(path)
+    try:
+        if not capture.isOpened():
+            raise ValueError('OpenCV could not open the video')
+
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+        metadata = {
+            'duration': round(frame_count / fps, 3) if fps and frame_count else None,
+            'fps': round(fps, 3) if fps else None,
+            'frame_count': frame_count or None,
+            'width': width or None,
+            'height': height or None,
+            'codec': _fourcc(capture.get(cv2.CAP_PROP_FOURCC)),
+        }
+
+        def frame_at(index):
+            capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ok, frame = capture.read()
+            return frame if ok else None
+
+        # Poster: a tenth of the way in, past black lead-in frames
+        poster = frame_at(frame_count // 10) if frame_count else None
+        if poster is None:
+            poster = frame_at(0)
+        if poster is None:
+            raise ValueError('No decodable frames')
+
+        tiles = []
+        if frame_count:
+            step = max(frame_count // sprite_frames, 1)
+            for index in range(0, frame_count, step)[:sprite_frames]:
+                frame = frame_at(index)
+                if frame is not None:
+                    tile_height = max(int(frame.shape[0] * sprite_tile_width / frame.shape[1]), 1)
+                    tiles.append(cv2.resize(frame, (sprite_tile_width, tile_height), interpolation=cv2.INTER_AREA))
+        if not tiles:
+            tiles = [cv2.resize(poster, (sprite_tile_width, max(int(poster.shape[0] * sprite_tile_width / poster.shape[1]), 1)))]
+
+        tile_height = tiles[0].shape[0]
+        rows = -(-len(tiles) // sprite_columns)
+        sheet = np.zeros((rows * tile_height, sprite_columns * sprite_tile_width, 3), dtype=np.uint8)
+        for i, tile in enumerate(tiles):
+            row, column = divmod(i, sprite_columns)
+            tile = tile[:tile_height]
+            sheet[row * tile_height:row * tile_height + tile.shape[0],
+                  column * sprite_tile_width:(column + 1) * sprite_tile_width] = tile
+        metadata['sprite'] = {
+            'columns': sprite_columns, 'rows': rows, 'tiles': len(tiles),
+            'tile_width': sprite_tile_width, 'tile_height': tile_height,
+        }
+
+        quality = [int(cv2.IMWRITE_JPEG_QUALITY), 80]
+        return {
+            'metadata': metadata,
+            'poster': cv2.imencode('.jpg', poster, quality)[1].tobytes(),
+            'sprite': cv2.imencode('.jpg', sheet, quality)[1].tobytes(),
+        }
+    finally:
+        capture.release()
+
+
+def extract_pdf(path, max_pages=500, max_text_chars=1000):
+    """
+    Read a PDF with pypdf and return its page count, document information and
+    the text of the first page. Text is skipped for documents over
+    ``max_pages``, since pypdf flattens the whole page tree to reach a page.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    result = {'encrypted': reader.is_encrypted, 'pages': None, 'document': {}, 'first_page_text': None}
+    if reader.is_encrypted:
+        # Many "protected" PDFs only restrict editing and open with an empty password
+        try:
+            if not reader.decrypt(''):
+                return result
+        except Exception:
+            return result
+
+    result['pages'] = len(reader.pages)
+    info = reader.metadata or {}
+    for key in ('/Title', '/Author', '/Subject', '/Creator', '/Producer', '/CreationDate', '/ModDate'):
+        value = info.get(key)
+        if value:
+            result['document'][key.lstrip('/').lower()] = str(value)[:500]
+
+    if result['pages'] and result['pages'] <= max_pages:
+        text = reader.pages[0].extract_text() or ''
+        result['first_page_text'] = ' '.join(text.split())[:max_text_chars]
+    else:
+        result['truncated'] = True
+    return result
@@ -0,0 +1,57 @@
+# reports/isolation.py
+
+import multiprocessing
+
+
+class IsolatedTaskError(Exception):
+    pass
+
+
+class IsolatedTaskTimeout(IsolatedTaskError):
+    pass
+
+
+def _call(conn, func, args, memory_mb):
+    if memory_mb:
+        try:
+            import resource
+            limit = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass
+    try:
+        conn.send((True, func(*args)))
+    except BaseException as e:
+        conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def run_isolated(func, *args, timeout, memory_mb=None):
+    """
+    Run ``func(*args)`` in a fresh child process and return its result.
+
+    Used for parsing untrusted media: a file that hangs the decoder is killed
+    after ``timeout`` seconds (IsolatedTaskTimeout), and one that crashes it or
+    blows past ``memory_mb`` only takes the child down (IsolatedTaskError).
+    ``func`` must be importable without Django, since the child is spawned.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_call, args=(sender, func, args, memory_mb), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            raise IsolatedTaskTimeout(f"{func.__name__} did not finish within {timeout}s")
+        ok, value = receiver.recv()
+    except EOFError:
+        raise IsolatedTaskError(f"{func.__name__} worker exited without a result")
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+    if not ok:
+        raise IsolatedTaskError(value)
+    return value
@@ -0,0 +1,65 @@
+# reports/longpoll.py
+#
+# Lets a comment-thread request wait for the next comment instead of the
+# client polling. Comments saved in this process wake waiters immediately
+# (see the ReportComment signal); ones saved by other processes are picked up
+# by a cheap EXISTS check every COMMENT_LONGPOLL_RECHECK seconds.
+#
+# A waiting request occupies a worker thread for the whole wait, so at most
+# COMMENT_LONGPOLL_MAX_WAITERS requests per process wait at once; the rest
+# answer straight away without the X-Long-Poll: held header, and the client
+# falls back to polling every few seconds. The default of 0 suits gunicorn's
+# sync workers (one thread each); see settings.py.
+
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+_condition = threading.Condition()
+_versions = defaultdict(int)
+_waiting = 0
+
+
+def comment_posted(report_id):
+    with _condition:
+        _versions[report_id] += 1
+        _condition.notify_all()
+
+
+def wait_for(report_id, has_new, timeout):
+    """
+    Block until ``has_new()`` is true or ``timeout`` seconds pass. ``has_new``
+    runs once up front, whenever a comment on ``report_id`` is posted in this
+    process, and every recheck interval. Returns whether the request was held:
+    when the process already has its maximum of waiters it returns False at
+    once, and the caller answers with what there is now.
+    """
+    global _waiting
+    with _condition:
+        if _waiting >= settings.COMMENT_LONGPOLL_MAX_WAITERS:
+            return False
+        _waiting += 1
+    try:
+        _wait(report_id, has_new, timeout)
+        return True
+    finally:
+        with _condition:
+            _waiting -= 1
+
+
+def _wait(report_id, has_new, timeout):
+    deadline = time.monotonic() + timeout
+    recheck = settings.COMMENT_LONGPOLL_RECHECK
+    while True:
+        # Read the version first so a comment landing during the check still wakes us
+        with _condition:
+            seen = _versions.get(report_id, 0)
+        if has_new():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        with _condition:
+            _condition.wait_for(lambda: _versions.get(report_id, 0) != seen, timeout=min(recheck, remaining))
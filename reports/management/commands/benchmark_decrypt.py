@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from encrypted_model_fields.fields import encrypt_str
+
+from reports.crypto import BulkDecryptor
+from reports.models import Report
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare decryption throughput of the per-row field descriptor path with "
+        "the in-process and process-pool bulk paths in reports.crypto."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000, help='Number of tokens to decrypt.')
+        parser.add_argument('--length', type=int, default=1000, help='Plaintext length in characters.')
+        parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: BULK_DECRYPT_WORKERS).')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        plaintext = 'x' * options['length']
+        tokens = [encrypt_str(plaintext).decode('utf-8') for _ in range(rows)]
+        field = Report._meta.get_field('description')
+
+        def per_row():
+            return [field.from_db_value(token, None, None) for token in tokens]
+
+        def in_process():
+            with BulkDecryptor(workers=1) as decryptor:
+                return decryptor.decrypt(tokens)
+
+        def process_pool():
+            with BulkDecryptor(workers=options['workers'], threshold=1) as decryptor:
+                return decryptor.decrypt(tokens)
+
+        self.stdout.write(f"Decrypting {rows} tokens of {options['length']} characters")
+        for label, run in (('per-row descriptor', per_row), ('bulk, in-process', in_process),
+                           ('bulk, process pool', process_pool)):
+            start = time.perf_counter()
+            result = run()
+            elapsed = time.perf_counter() - start
+            assert result[0] == plaintext and len(result) == rows
+            self.stdout.write(f"{label:<20} {rows / elapsed:>12,.0f} rows/sec ({elapsed:.2f}s)")
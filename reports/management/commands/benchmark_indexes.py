@@ -0,0 +1,121 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from reports.models import Report, Notification, ReportComment
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway dataset and print query plans and timings for the hot "
+        "report, notification and comment queries with and without the indexes "
+        "declared on the models. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reports', type=int, default=20000, help='Number of reports to seed.')
+        parser.add_argument('--users', type=int, default=200, help='Number of submitting users to seed.')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['reports'], options['users'])
+            queries = self.hot_queries()
+
+            self.stdout.write(self.style.MIGRATE_HEADING('Without indexes'))
+            self.toggle_indexes(drop=True)
+            before = self.run(queries, options['repeat'])
+
+            self.stdout.write(self.style.MIGRATE_HEADING('With indexes'))
+            self.toggle_indexes(drop=False)
+            after = self.run(queries, options['repeat'])
+
+            self.stdout.write(self.style.MIGRATE_HEADING('Summary (median ms)'))
+            for label in queries:
+                self.stdout.write(f"{label:<40} {before[label]:>9.3f} -> {after[label]:>9.3f}")
+
+            transaction.set_rollback(True)
+
+    def seed(self, report_count, user_count):
+        User = get_user_model()
+        now = timezone.now()
+        users = User.objects.bulk_create(
+            User(username=f'bench-user-{i}', email=f'bench{i}@example.com', password='!')
+            for i in range(user_count)
+        )
+        statuses = [choice for choice, _ in Report.STATUS_CHOICES]
+        categories = [choice for choice, _ in Report.CATEGORY_CHOICES]
+        reports = Report.objects.bulk_create(
+            Report(
+                title=f'Benchmark report {i}',
+                category=random.choice(categories),
+                status=random.choice(statuses),
+                description='Seeded description',
+                submitted_by=random.choice(users),
+            )
+            for i in range(report_count)
+        )
+        # auto_now_add ignores explicit values, so spread the timestamps afterwards.
+        for report in reports:
+            report.submitted_at = now - timedelta(minutes=random.randint(0, 60 * 24 * 365))
+        Report.objects.bulk_update(reports, ['submitted_at'], batch_size=1000)
+
+        Notification.objects.bulk_create(
+            Notification(user=report.submitted_by, report=report, message='Status changed', is_read=random.random() < 0.9)
+            for report in reports
+        )
+        ReportComment.objects.bulk_create(
+            ReportComment(report=random.choice(reports), sender=random.choice(users), message='Comment',
+                          is_internal=random.random() < 0.2)
+            for _ in range(report_count * 2)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        self.user = users[0]
+        self.report = reports[0]
+        self.stdout.write(f"Seeded {report_count} reports for {user_count} users.")
+
+    def hot_queries(self):
+        return {
+            'admin list by status': Report.objects.filter(status='pending').order_by('-submitted_at', '-id')[:25],
+            'admin list by category': Report.objects.filter(category='abuse').order_by('-submitted_at', '-id')[:25],
+            'my reports': Report.objects.filter(submitted_by=self.user).order_by('-submitted_at', '-id')[:25],
+            'notifications': Notification.objects.filter(user=self.user).order_by('-created_at')[:50],
+            'unread notifications': Notification.objects.filter(user=self.user, is_read=False).order_by('-created_at'),
+            'comment thread': ReportComment.objects.filter(report=self.report, is_internal=False).order_by('sent_at'),
+        }
+
+    def toggle_indexes(self, drop):
+        # Entering schema_editor() is not allowed inside a transaction on SQLite,
+        # but index DDL is plain SQL that every backend can run and roll back.
+        editor = connection.schema_editor()
+        for model in (Report, Notification, ReportComment):
+            for index in model._meta.indexes:
+                if drop:
+                    editor.execute(editor.sql_delete_index % {
+                        'table': editor.quote_name(model._meta.db_table),
+                        'name': editor.quote_name(index.name),
+                    })
+                else:
+                    editor.execute(index.create_sql(model, editor))
+
+    def run(self, queries, repeat):
+        timings = {}
+        for label, queryset in queries.items():
+            self.stdout.write(self.style.SQL_KEYWORD(label))
+            self.stdout.write(queryset.explain())
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.all())
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[label] = statistics.median(samples)
+        return timings
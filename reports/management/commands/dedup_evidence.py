@@ -0,0 +1,67 @@
+import hashlib
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reports.models import Report
+from reports.storage import evidence_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Move evidence stored under per-upload names (media/reports/...) into the "
+        "content-addressed blob tree, so identical files are kept once and shared. "
+        "Reports already pointing at a blob are skipped, so the command can be "
+        "interrupted and re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only hash the files and report the savings.')
+        parser.add_argument('--keep-originals', action='store_true', help='Leave the old files on disk.')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        reports = (
+            Report.objects.exclude(file_upload__isnull=True).exclude(file_upload='')
+            .exclude(file_upload__startswith=f'{evidence_storage.prefix}/')
+            .only('id', 'file_upload', 'evidence')
+            .order_by('id')
+        )
+
+        seen = {}
+        moved = missing = total_bytes = 0
+        for report in reports.iterator():
+            old_name = report.file_upload.name
+            if not evidence_storage.exists(old_name):
+                missing += 1
+                self.stderr.write(f"Report {report.pk}: {old_name} is missing, skipped.")
+                continue
+
+            size = evidence_storage.size(old_name)
+            total_bytes += size
+            if dry_run:
+                digest = hashlib.sha256()
+                with evidence_storage.open(old_name, 'rb') as fh:
+                    for chunk in fh.chunks():
+                        digest.update(chunk)
+                seen.setdefault(digest.hexdigest(), size)
+                moved += 1
+                continue
+
+            with transaction.atomic():
+                with evidence_storage.open(old_name, 'rb') as fh:
+                    new_name = evidence_storage.save(old_name, fh)
+                report.file_upload.name = new_name
+                # The post_save signal links the report to its blob and counts the reference
+                report.save(update_fields=['file_upload'])
+                if not options['keep_originals']:
+                    transaction.on_commit(lambda name=old_name: evidence_storage.delete(name))
+            seen.setdefault(new_name, size)
+            moved += 1
+
+        unique_bytes = sum(seen.values())
+        verb = 'Would move' if dry_run else 'Moved'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {moved} files into {len(seen)} blobs: {total_bytes} -> {unique_bytes} bytes "
+            f"({total_bytes - unique_bytes} saved). {missing} missing."
+        ))
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reports.models import UploadSession
+from reports.uploads import discard
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete resumable upload sessions that were never completed within "
+        "CHUNKED_UPLOAD_EXPIRY_HOURS, along with their partial files, and "
+        "completed sessions older than that."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=settings.CHUNKED_UPLOAD_EXPIRY_HOURS,
+                            help='Age after which a session is purged.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        expired = UploadSession.objects.filter(created_at__lt=cutoff)
+        count = 0
+        for session in expired.iterator():
+            discard(session)
+            count += 1
+        expired.delete()
+        self.stdout.write(self.style.SUCCESS(f"Purged {count} upload sessions."))
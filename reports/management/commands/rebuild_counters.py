@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reports.counters import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the badge counters (unread notifications, reports per status, "
+        "comment counts) from the source tables, repairing any drift. Counts "
+        "changed while it runs may be off until the next rebuild, so prefer a quiet period."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} counters."))
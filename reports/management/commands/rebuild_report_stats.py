@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reports.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill or repair the ReportDailyStats analytics rollup from the Report "
+        "table. Run it once after migrating; reports changed while it runs may be "
+        "off until the next rebuild, so prefer a quiet period."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} daily stats rows."))
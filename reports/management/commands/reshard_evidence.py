@@ -0,0 +1,79 @@
+import os
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from reports.evidence import rename_blob
+from reports.media import derivative_name
+from reports.models import EvidenceBlob
+from reports.storage import evidence_storage
+
+DERIVATIVE_FIELDS = {'thumbnail': 'thumb', 'preview': 'preview', 'sprite': 'sprite'}
+
+
+def move(source, target):
+    if source == target or not os.path.exists(source):
+        return
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.exists(target):
+        # Same content hash, so the copy already in place is identical
+        os.remove(source)
+    else:
+        os.replace(source, target)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move evidence blobs and their derivatives into the layout configured by "
+        "EVIDENCE_SHARD_DEPTH/EVIDENCE_SHARD_WIDTH and rewrite the stored names in "
+        "batches. Safe to run while the site is up (files are moved before rows are "
+        "rewritten, and the storage resolves both locations) and to re-run after an "
+        "interruption. Per-upload files from before content addressing are handled by "
+        "dedup_evidence, which writes straight into the current layout."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Blobs per batch.')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to pause between batches.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the blobs that would move.')
+
+    def handle(self, *args, **options):
+        last_id = 0
+        checked = moved = 0
+        while True:
+            batch = list(EvidenceBlob.objects.filter(pk__gt=last_id).order_by('pk')[:options['batch_size']])
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            for blob in batch:
+                checked += 1
+                if self.reshard(blob, options['dry_run']):
+                    moved += 1
+            self.stdout.write(f"Checked {checked} blobs, moved {moved} (last id {last_id}).")
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        verb = 'Would move' if options['dry_run'] else 'Moved'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {moved} of {checked} blobs."))
+
+    def reshard(self, blob, dry_run):
+        ext = os.path.splitext(blob.file.name)[1]
+        targets = {'file': evidence_storage.blob_name(blob.sha256, ext)}
+        for field, variant in DERIVATIVE_FIELDS.items():
+            if getattr(blob, field):
+                targets[field] = derivative_name(blob, variant)
+        changed = {field: name for field, name in targets.items() if getattr(blob, field).name != name}
+        if not changed or dry_run:
+            return bool(changed)
+
+        # Files first: until the rows are rewritten, the old names still resolve
+        for field, name in changed.items():
+            if field == 'file':
+                move(evidence_storage.stored_path(blob.file.name), evidence_storage.stored_path(name))
+            else:
+                move(default_storage.path(getattr(blob, field).name), default_storage.path(name))
+
+        new_file = changed.pop('file', blob.file.name)
+        rename_blob(blob, new_file, **changed)
+        return True
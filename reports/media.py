@@ -0,0 +1,185 @@
+# reports/media.py
+
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from tasks.queue import task
+
+from .extractors import extract_pdf, extract_video
+from .evidence import purge_name, rename_blob
+from .isolation import IsolatedTaskError, run_isolated
+from .models import EvidenceBlob, Report
+from .storage import evidence_storage, join_shard
+from .validators import get_upload_policy
+
+logger = logging.getLogger(__name__)
+
+# Metadata keys Pillow exposes in Image.info that can identify a device,
+# person or place. ICC profiles are kept; they only describe colour.
+PRIVATE_INFO_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop')
+
+DERIVATIVE_EXTENSIONS = {'thumb': 'webp', 'preview': 'jpg', 'sprite': 'jpg'}
+
+
+def schedule_processing(blob_id):
+    """Run the derivative pipeline for a blob once the current transaction commits."""
+    if settings.EVIDENCE_PIPELINE_ASYNC:
+        # Queued in the same transaction as the upload, picked up by the worker
+        process_blob.enqueue(blob_id)
+    else:
+        transaction.on_commit(lambda: process_blob(blob_id))
+
+
+def derivative_name(blob, variant):
+    ext = DERIVATIVE_EXTENSIONS[variant]
+    return join_shard('derivatives', blob.sha256, f"{blob.sha256}_{variant}.{ext}")
+
+
+@task
+def process_blob(blob_id):
+    blob = EvidenceBlob.objects.filter(pk=blob_id, processed_at__isnull=True).first()
+    if blob is None:
+        return
+
+    try:
+        kind = get_upload_policy().kind_for(blob.file.name)
+    except ValidationError:
+        kind = None
+    if kind == 'Video':
+        process_video(blob)
+    elif kind == 'PDF':
+        process_pdf(blob)
+    else:
+        process_image(blob)
+
+
+def process_image(blob):
+    try:
+        with evidence_storage.open(blob.file.name, 'rb') as fh:
+            image = Image.open(fh)
+            image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        # Not an image (or not one we can safely decode): nothing to derive
+        EvidenceBlob.objects.filter(pk=blob.pk).update(processed_at=timezone.now())
+        return
+
+    if has_private_metadata(image):
+        fmt = image.format
+        # Bake the EXIF orientation into the pixels before the tag is dropped
+        image = ImageOps.exif_transpose(image)
+        blob = replace_original(blob, image, fmt)
+
+    width, height = image.size
+    EvidenceBlob.objects.filter(pk=blob.pk).update(
+        is_image=True, width=width, height=height,
+        thumbnail=save_derivative(blob, 'thumb', image, settings.EVIDENCE_THUMBNAIL_SIZE, 'WEBP', quality=80),
+        preview=save_derivative(blob, 'preview', image, settings.EVIDENCE_PREVIEW_SIZE, 'JPEG', quality=85, optimize=True),
+        processed_at=timezone.now(),
+    )
+    Report.objects.filter(evidence=blob).update(is_image=True, updated_at=timezone.now())
+
+
+def process_video(blob):
+    """
+    Poster frame, sprite sheet and stream metadata for a video blob.
+
+    Decoding happens in a child process with a hard timeout, so a malformed
+    file can at worst cost one killed process, never a worker thread.
+    """
+    fields = {'is_video': True, 'processed_at': timezone.now()}
+    try:
+        result = run_isolated(
+            extract_video, evidence_storage.path(blob.file.name), settings.EVIDENCE_VIDEO_SPRITE_FRAMES,
+            timeout=settings.EVIDENCE_VIDEO_TIMEOUT,
+        )
+    except IsolatedTaskError as e:
+        # Still a video as far as the reviewers are concerned, just without previews
+        logger.warning("Video extraction failed for blob %s: %s", blob.pk, e)
+        fields['metadata'] = {'error': 'Video could not be processed'}
+    else:
+        metadata = result['metadata']
+        poster = Image.open(BytesIO(result['poster']))
+        fields.update(
+            width=metadata['width'], height=metadata['height'], metadata=metadata,
+            thumbnail=save_derivative(blob, 'thumb', poster, settings.EVIDENCE_THUMBNAIL_SIZE, 'WEBP', quality=80),
+            preview=save_derivative(blob, 'preview', poster, settings.EVIDENCE_PREVIEW_SIZE, 'JPEG', quality=85, optimize=True),
+            sprite=store_derivative(derivative_name(blob, 'sprite'), result['sprite']),
+        )
+    EvidenceBlob.objects.filter(pk=blob.pk).update(**fields)
+    Report.objects.filter(evidence=blob).update(is_video=True, updated_at=timezone.now())
+
+
+def process_pdf(blob):
+    """
+    Page count, document information and first-page text for a PDF blob.
+
+    Parsed once per distinct file, in a child process bounded by
+    EVIDENCE_PDF_TIMEOUT seconds and EVIDENCE_PDF_MEMORY_MB of address space.
+    """
+    try:
+        metadata = run_isolated(
+            extract_pdf, evidence_storage.path(blob.file.name), settings.EVIDENCE_PDF_MAX_PAGES,
+            timeout=settings.EVIDENCE_PDF_TIMEOUT, memory_mb=settings.EVIDENCE_PDF_MEMORY_MB,
+        )
+    except IsolatedTaskError as e:
+        logger.warning("PDF extraction failed for blob %s: %s", blob.pk, e)
+        metadata = {'error': 'PDF could not be processed'}
+    EvidenceBlob.objects.filter(pk=blob.pk).update(metadata=metadata, processed_at=timezone.now())
+    # Bump the reports' row version so cached representations pick this up
+    Report.objects.filter(evidence=blob).update(updated_at=timezone.now())
+
+
+def has_private_metadata(image):
+    return bool(image.getexif()) or any(key in image.info for key in PRIVATE_INFO_KEYS) or bool(getattr(image, 'text', None))
+
+
+def replace_original(blob, image, fmt):
+    """
+    Re-encode the original without its metadata and point every report at it.
+
+    The sanitized bytes get their own content address. If that blob already
+    exists (the same photo was cleaned before), references are merged into it.
+    Returns the blob that now holds the sanitized file.
+    """
+    buffer = BytesIO()
+    options = {'icc_profile': image.info.get('icc_profile')} if image.info.get('icc_profile') else {}
+    if fmt == 'JPEG':
+        image.convert('RGB').save(buffer, format='JPEG', quality=95, **options)
+    else:
+        image.save(buffer, format=fmt, **options)
+
+    old_name = blob.file.name
+    with transaction.atomic():
+        new_name = evidence_storage.save(old_name, ContentFile(buffer.getvalue()))
+        blob = rename_blob(
+            blob, new_name,
+            sha256=evidence_storage.digest_from_name(new_name), size=evidence_storage.size(new_name),
+        )
+        transaction.on_commit(lambda: purge_name(old_name))
+    return blob
+
+
+def save_derivative(blob, variant, image, max_side, fmt, **options):
+    copy = image.copy()
+    copy.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    if fmt == 'JPEG' and copy.mode not in ('RGB', 'L'):
+        copy = copy.convert('RGB')
+    buffer = BytesIO()
+    copy.save(buffer, format=fmt, **options)
+
+    return store_derivative(derivative_name(blob, variant), buffer.getvalue())
+
+
+def store_derivative(name, content):
+    # Names are derived from the content hash, so an existing file is identical
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, ContentFile(content))
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-17 19:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0011_alter_report_is_anonymous_alter_report_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at'], name='notification_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['user', '-created_at'], name='notification_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['-submitted_at', '-id'], name='report_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['status', '-submitted_at', '-id'], name='report_status_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['category', '-submitted_at', '-id'], name='report_category_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['submitted_by', '-submitted_at', '-id'], name='report_submitter_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reportcomment',
+            index=models.Index(fields=['report', 'is_internal', 'sent_at'], name='comment_thread_idx'),
+        ),
+    ]
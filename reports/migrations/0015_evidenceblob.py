@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:41
+
+import django.db.models.deletion
+import reports.models
+import reports.storage
+import reports.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0014_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvidenceBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('file', models.FileField(max_length=255, storage=reports.storage.get_evidence_storage, unique=True, upload_to='')),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='file_upload',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=reports.storage.get_evidence_storage, upload_to=reports.models.user_report_path, validators=[reports.validators.validate_upload_file]),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='evidence',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reports', to='reports.evidenceblob'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0016_evidenceblob_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evidenceblob',
+            name='is_video',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='evidenceblob',
+            name='metadata',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='evidenceblob',
+            name='sprite',
+            field=models.FileField(blank=True, max_length=255, upload_to=''),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0019_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('under_review', 'Under Review'), ('resolved', 'Resolved'), ('canclelled', 'Cancelled'), ('escalated', 'Escalated'), ('rejected', 'Rejected')], max_length=20)),
+                ('category', models.CharField(choices=[('abuse', 'Abuse'), ('corruption', 'Corruption'), ('harassment', 'Harassment'), ('other', 'Other')], max_length=50)),
+                ('is_premium', models.BooleanField()),
+                ('is_anonymous', models.BooleanField()),
+                ('priority_flag', models.BooleanField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'report daily stats',
+                'constraints': [models.UniqueConstraint(fields=('day', 'status', 'category', 'is_premium', 'is_anonymous', 'priority_flag'), name='report_daily_stats_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:37
+
+import reports.models
+import reports.storage
+import reports.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0020_reportdailystats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='report',
+            name='file_upload',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=reports.storage.get_evidence_storage, upload_to=reports.models.user_report_path, validators=[reports.validators.validate_new_upload]),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0021_file_upload_new_files_only'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingstatusemail',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
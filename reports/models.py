@@ -7,7 +7,8 @@ import uuid
 import os
 import re
 from encrypted_model_fields.fields import EncryptedTextField
-from .validators import validate_upload_file
+from .validators import validate_new_upload
+from .storage import get_evidence_storage
 from django.utils import timezone
 from django.contrib.auth.models import AbstractUser # Ensure this is present if User model is here
 
@@ -88,6 +89,36 @@ class AdminAccessRequest(models.Model):
         return f"Access Request for {self.user.username} ({self.request_type}) - {self.status}"
 
 
+class EvidenceBlob(models.Model):
+    """
+    One stored evidence file, shared by every report that uploaded the same bytes.
+
+    ``ref_count`` is the number of reports whose ``file_upload`` points at the
+    blob; it is kept in step by reports/signals.py and the file is removed
+    when it drops to zero.
+    """
+    sha256 = models.CharField(max_length=64, db_index=True)
+    file = models.FileField(storage=get_evidence_storage, max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Filled in by the derivative pipeline (reports/media.py). For videos the
+    # thumbnail and preview are renditions of the poster frame.
+    is_image = models.BooleanField(default=False)
+    is_video = models.BooleanField(default=False)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    thumbnail = models.FileField(max_length=255, blank=True)
+    preview = models.FileField(max_length=255, blank=True)
+    sprite = models.FileField(max_length=255, blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+
 class Report(models.Model):
     CATEGORY_CHOICES = [
         ('abuse', 'Abuse'),
@@ -118,12 +149,24 @@ class Report(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     token = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     submitted_at = models.DateTimeField(auto_now_add=True)
+    # Row version for ETag/Last-Modified; also bumped when a comment changes
+    updated_at = models.DateTimeField(auto_now=True)
 
     file_upload = models.FileField(
         upload_to=user_report_path, # This is the line causing the error
+        storage=get_evidence_storage,  # content-addressed: identical files are stored once
+        max_length=255,
         blank=True,
         null=True,
-        validators=[validate_upload_file]
+        validators=[validate_new_upload]
+    )
+    evidence = models.ForeignKey(
+        EvidenceBlob,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='reports'
     )
     is_image = models.BooleanField(default=False)
     is_video = models.BooleanField(default=False)
@@ -150,10 +193,41 @@ class Report(models.Model):
 
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            # Keyset pagination order (reports/pagination.py), alone and behind
+            # the admin list filters and the per-submitter "my reports" filter.
+            models.Index(fields=['-submitted_at', '-id'], name='report_submitted_idx'),
+            models.Index(fields=['status', '-submitted_at', '-id'], name='report_status_submitted_idx'),
+            models.Index(fields=['category', '-submitted_at', '-id'], name='report_category_submitted_idx'),
+            models.Index(fields=['submitted_by', '-submitted_at', '-id'], name='report_submitter_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.category}) - {self.status} - Token: {self.token}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the evidence signal skip saves that didn't change the file
+        if 'file_upload' in field_names:
+            instance._loaded_file_name = instance.file_upload.name or None
+        # ...and the counter signals work out which status counts to move
+        if 'status' in field_names and 'submitted_by_id' in field_names:
+            instance._loaded_counted = (instance.submitted_by_id, instance.status)
+        # ...and which ReportDailyStats row it was counted in
+        if all(name in field_names for name in cls.STATS_FIELDS):
+            instance._loaded_stats_key = instance.stats_key()
+        return instance
+
+    # Dimensions of the ReportDailyStats rollup, besides the submission day
+    STATS_FIELDS = ('submitted_at', 'status', 'category', 'is_premium', 'is_anonymous', 'priority_flag')
+
+    def stats_key(self):
+        return (
+            timezone.localtime(self.submitted_at, timezone.get_default_timezone()).date(),
+            self.status, self.category, self.is_premium, self.is_anonymous, self.priority_flag,
+        )
+
     def get_certificate_qr_data(self):
         frontend_url = config('FRONTEND_BASE_URL', default='https://yourapp.com')
         return f"{frontend_url}/reports/{self.token}/verify"
@@ -164,14 +238,32 @@ class Notification(models.Model):
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     report = models.ForeignKey(Report, on_delete=models.SET_NULL, null=True, blank=True, related_name='notifications')
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notification_user_idx'),
+            # Partial index for the unread badge; read notifications are the bulk of the table.
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(is_read=False),
+                name='notification_unread_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Notification for {self.user.username}: {self.message[:50]}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The unread counter only moves when is_read actually flips
+        if 'is_read' in field_names:
+            instance._loaded_is_read = instance.is_read
+        return instance
+
 
 class ReportComment(models.Model):
     report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='comments')
@@ -182,6 +274,118 @@ class ReportComment(models.Model):
 
     class Meta:
         ordering = ['sent_at']
+        indexes = [
+            models.Index(fields=['report', 'is_internal', 'sent_at'], name='comment_thread_idx'),
+        ]
+
+    def __str__(self):
+        return f"Comment on Report {self.report.title} by {self.sender.username}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'is_internal' in field_names:
+            instance._loaded_is_internal = instance.is_internal
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # A new or edited comment changes the report's thread, so bump its row version
+        Report.objects.filter(pk=self.report_id).update(updated_at=timezone.now())
+
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked evidence upload.
+
+    Chunks are appended to ``temp_path`` on disk at the offset the client
+    sends; ``received`` is the number of contiguous bytes stored so far.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.filename}) - {self.received}/{self.size} bytes"
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{self.id}.part")
+
+    @property
+    def is_complete(self):
+        return self.received == self.size
+
+
+class PendingStatusEmail(models.Model):
+    """
+    A report status change waiting to go out in the submitter's next digest
+    (reports/digests.py). ``claimed_at`` is set while a delivery run is
+    sending it; rows are deleted once their digest is sent.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='pending_status_emails')
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='pending_status_emails')
+    status = models.CharField(max_length=20)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='pending_email_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"Status email for {self.user_id}: report {self.report_id} -> {self.status}"
+
+
+class Counter(models.Model):
+    """
+    A denormalized count, kept in step with its source rows by the signals in
+    reports/signals.py (see reports/counters.py). ``scope`` is ``user:<id>``,
+    ``report:<id>`` or ``admin``; rebuild_counters recomputes everything.
+    """
+    scope = models.CharField(max_length=64)
+    name = models.CharField(max_length=64)
+    value = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'name'], name='counter_scope_name_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.name} = {self.value}"
+
+
+class ReportDailyStats(models.Model):
+    """
+    Number of reports submitted on ``day`` (in TIME_ZONE) per combination of
+    the analytics dimensions, so the analytics views sum a few hundred rows
+    instead of scanning Report. Maintained by the signals in
+    reports/signals.py (see reports/rollups.py); rebuild_report_stats
+    recomputes it from scratch.
+    """
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=Report.STATUS_CHOICES)
+    category = models.CharField(max_length=50, choices=Report.CATEGORY_CHOICES)
+    is_premium = models.BooleanField()
+    is_anonymous = models.BooleanField()
+    priority_flag = models.BooleanField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'report daily stats'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'status', 'category', 'is_premium', 'is_anonymous', 'priority_flag'],
+                name='report_daily_stats_uniq',
+            ),
+        ]
 
     def __str__(self):
-        return f"Comment on Report {self.report.title} by {self.sender.username}"
\ No newline at end of file
+        return f"{self.day} {self.status}/{self.category} = {self.count}"
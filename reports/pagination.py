@@ -0,0 +1,98 @@
+# reports/pagination.py
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class ReportCursorPagination(CursorPagination):
+    """
+    Keyset pagination for report listings, ordered by (-submitted_at, -id).
+
+    The opaque cursor carries the (submitted_at, id) pair of the row at the edge
+    of the current page, so every page is a bounded range scan no matter how
+    deep the client has paged. The id tie-breaker makes each position unique,
+    which means the offset part of DRF's cursor is never needed.
+    """
+    ordering = ('-submitted_at', '-id')
+    page_size = settings.REPORT_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.REPORT_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self.cursor.position if self.cursor else None
+
+        if reverse:
+            queryset = queryset.order_by('submitted_at', 'id')
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if position is not None:
+            submitted_at, pk = self._parse_position(position)
+            if reverse:
+                queryset = queryset.filter(
+                    Q(submitted_at__gt=submitted_at) | Q(submitted_at=submitted_at, id__gt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(submitted_at__lt=submitted_at) | Q(submitted_at=submitted_at, id__lt=pk)
+                )
+
+        # Fetch one extra row to find out whether another page follows.
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Paged backwards past the newest row: start again from the top.
+            return self.encode_cursor(Cursor(offset=0, reverse=False, position=None))
+        position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Paged forwards past the oldest row: step back to the last page.
+            return self.encode_cursor(Cursor(offset=0, reverse=True, position=None))
+        position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(self, instance, ordering):
+        return f"{instance.submitted_at.isoformat()}|{instance.pk}"
+
+    def _parse_position(self, position):
+        submitted_at, _, pk = position.rpartition('|')
+        try:
+            submitted_at = parse_datetime(submitted_at)
+        except ValueError:
+            submitted_at = None
+        if submitted_at is None or not pk.isdigit():
+            raise NotFound(self.invalid_cursor_message)
+        return submitted_at, int(pk)
@@ -0,0 +1,147 @@
+# reports/realtime.py
+#
+# Fan-out of new notifications to the WebSocket connections open on this
+# process (reports/websocket.py). NOTIFICATION_FANOUT_BACKEND picks how a
+# notification created on one node reaches sockets held by another:
+#
+#   reports.realtime.InProcessFanout  - single ASGI process serving the API too
+#   reports.realtime.PostgresFanout   - any number of nodes sharing a Postgres
+#                                       database, via LISTEN/NOTIFY
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def notification_payload(notification):
+    from .serializers import NotificationSerializer
+
+    data = NotificationSerializer(notification).data
+    # `message` is what NotificationDropdown.jsx reads; the full row rides along
+    return {'type': 'notification', 'message': data['message'], 'notification': data}
+
+
+class InProcessFanout:
+    """Delivers to subscribers in this process only."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """Register the running event loop for ``user_id``; returns the queue payloads arrive on."""
+        queue = asyncio.Queue(maxsize=settings.NOTIFICATION_SOCKET_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[user_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.difference_update({entry for entry in subscribers if entry[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def has_subscribers(self, user_id):
+        with self._lock:
+            return bool(self._subscribers.get(user_id))
+
+    def publish(self, notification):
+        """Called from synchronous code once the notification has been committed."""
+        if self.has_subscribers(notification.user_id):
+            self.deliver(notification.user_id, notification_payload(notification))
+
+    def deliver(self, user_id, payload):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            # Safe from any thread; a full queue means a stalled client, which drops the message
+            loop.call_soon_threadsafe(self._put, queue, payload)
+
+    @staticmethod
+    def _put(queue, payload):
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.warning("Dropping notification push for a slow WebSocket client")
+
+
+class PostgresFanout(InProcessFanout):
+    """
+    Broadcasts through Postgres LISTEN/NOTIFY so every node sees every new
+    notification. Only ids cross the broker (NOTIFY payloads are capped at
+    8000 bytes); a node loads and serializes the row only if one of its own
+    sockets belongs to the recipient.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.channel = settings.NOTIFICATION_FANOUT_CHANNEL
+        self._listener = None
+
+    def subscribe(self, user_id):
+        self._ensure_listener()
+        return super().subscribe(user_id)
+
+    def publish(self, notification):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, %s)',
+                [self.channel, json.dumps({'user': notification.user_id, 'id': notification.pk})],
+            )
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='notification-listener', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        import psycopg2
+
+        params = connections['default'].get_connection_params()
+        conn = psycopg2.connect(**params)
+        conn.set_session(autocommit=True)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            while True:
+                if select.select([conn], [], [], 30) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self._on_notify(conn.notifies.pop(0).payload)
+        except Exception:
+            logger.exception("Notification listener stopped; it restarts with the next connection")
+        finally:
+            conn.close()
+
+    def _on_notify(self, raw):
+        from .models import Notification
+
+        try:
+            message = json.loads(raw)
+            if not self.has_subscribers(message['user']):
+                return
+            notification = Notification.objects.select_related('report').filter(pk=message['id']).first()
+            if notification is not None:
+                self.deliver(notification.user_id, notification_payload(notification))
+        except Exception:
+            logger.exception("Could not push notification %r", raw)
+        finally:
+            close_old_connections()
+
+
+@lru_cache(maxsize=None)
+def get_fanout():
+    return import_string(settings.NOTIFICATION_FANOUT_BACKEND)()
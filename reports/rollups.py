@@ -0,0 +1,72 @@
+# reports/rollups.py
+#
+# The ReportDailyStats rollup behind the admin analytics (reports/analytics.py).
+# Like the badge counters (reports/counters.py) it moves in the same
+# transaction as the report change: signal handlers cover save() and delete(), and
+# counters.update_report_status and counters.update_reports cover bulk updates.
+# Code that changes a dimension with a plain queryset.update() must call move() here.
+# `manage.py rebuild_report_stats` backfills or repairs the table. Every
+# change also retires the cached analytics payloads (reports/cache.py).
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .cache import invalidate_analytics
+from .models import Report, ReportDailyStats
+
+DIMENSIONS = ('status', 'category', 'is_premium', 'is_anonymous', 'priority_flag')
+
+
+def bump(key, delta=1):
+    """Add ``delta`` to the rollup row for ``key`` (a Report.stats_key()), creating it on first use."""
+    if not delta:
+        return
+    invalidate_analytics()
+    lookup = dict(zip(('day',) + DIMENSIONS, key))
+    if ReportDailyStats.objects.filter(**lookup).update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            ReportDailyStats.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        # Another transaction created it first
+        ReportDailyStats.objects.filter(**lookup).update(count=F('count') + delta)
+
+
+def grouped(queryset):
+    """``(stats key, number of reports)`` for every rollup row ``queryset`` falls into."""
+    rows = (
+        queryset.annotate(stats_day=TruncDate('submitted_at', tzinfo=timezone.get_default_timezone()))
+        .values('stats_day', *DIMENSIONS).annotate(n=Count('id')).order_by()
+    )
+    return [((row['stats_day'],) + tuple(row[name] for name in DIMENSIONS), row['n']) for row in rows]
+
+
+def move(queryset, **changes):
+    """
+    Shift the rollup for ``queryset.update(**changes)``; call it in the same
+    transaction, before the update. Only dimension fields matter in ``changes``.
+    """
+    changes = {name: value for name, value in changes.items() if name in DIMENSIONS}
+    if not changes:
+        return
+    for key, n in grouped(queryset):
+        new_key = key[:1] + tuple(changes.get(name, value) for name, value in zip(DIMENSIONS, key[1:]))
+        if new_key != key:
+            bump(key, -n)
+            bump(new_key, n)
+
+
+def rebuild():
+    """Recompute the rollup from Report. Returns the number of rows written."""
+    with transaction.atomic():
+        rows = [(key, n) for key, n in grouped(Report.objects.all()) if n]
+        ReportDailyStats.objects.all().delete()
+        ReportDailyStats.objects.bulk_create(
+            [ReportDailyStats(count=n, **dict(zip(('day',) + DIMENSIONS, key))) for key, n in rows],
+            batch_size=1000,
+        )
+        invalidate_analytics()
+    return len(rows)
@@ -0,0 +1,129 @@
+# reports/sendfile.py
+
+import os
+import re
+from mimetypes import guess_type
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Read-only view of ``length`` bytes of a file starting at ``start``."""
+
+    def __init__(self, fh, start, length):
+        self.fh = fh
+        self.remaining = length
+        fh.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fh.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.fh.close()
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single ``bytes=`` range, None to
+    serve the whole file, or False if the range cannot be satisfied.
+    Multi-range requests are answered with the whole file, as RFC 9110 allows.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if value.startswith('"') or value.startswith('W/'):
+        return value == etag
+    timestamp = parse_http_date_safe(value)
+    return timestamp is not None and int(mtime) <= timestamp
+
+
+def serve_file(request, path, name, etag=None, max_age=None):
+    """
+    Stream a file from disk with conditional GET and single byte-range support.
+
+    Whole files go out through FileResponse, which lets the WSGI server use
+    ``sendfile``. If EVIDENCE_ACCEL_REDIRECT_HEADER is set, the body is left to
+    the front-end server instead (nginx ``X-Accel-Redirect`` with
+    EVIDENCE_ACCEL_REDIRECT_PREFIX + name, or Apache/lighttpd ``X-Sendfile``
+    with the absolute path); it then handles ranges itself.
+
+    Responses must be revalidated unless ``max_age`` is given, for files whose
+    name and ETag change with their content.
+    """
+    stat = os.stat(path)
+    size, mtime = stat.st_size, stat.st_mtime
+    etag = etag or f'"{int(mtime)}-{size}"'
+    content_type = guess_type(name)[0] or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(mtime))
+    if response is None:
+        response = _build_response(request, path, name, size, mtime, etag, content_type)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    response['Accept-Ranges'] = 'bytes'
+    # Evidence is per-user: never store it in shared caches
+    if max_age is None:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, private=True, max_age=max_age, immutable=True)
+    return response
+
+
+def _build_response(request, path, name, size, mtime, etag, content_type):
+    header = settings.EVIDENCE_ACCEL_REDIRECT_HEADER
+    if header:
+        response = HttpResponse(content_type=content_type)
+        if header.lower() == 'x-accel-redirect':
+            response[header] = settings.EVIDENCE_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + name
+        else:
+            response[header] = path
+        return response
+
+    byte_range = None
+    if 'Range' in request.headers and if_range_matches(request, etag, mtime):
+        byte_range = parse_range(request.headers['Range'], size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        return FileResponse(open(path, 'rb'), content_type=content_type)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = FileResponse(RangeFile(open(path, 'rb'), start, length), content_type=content_type, status=206)
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
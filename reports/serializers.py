@@ -2,10 +2,110 @@
 
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.urls import reverse
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from .models import User, Organization, AdminAccessRequest, Report, Notification, ReportComment
+from .models import User, Organization, AdminAccessRequest, Report, Notification, ReportComment, UploadSession
+from .validators import validate_upload_size, validate_upload_file
+from .upload_handlers import get_upload_rejection
+from .evidence import make_access_token
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from django.utils import timezone # Import timezone for potential use, keep for consistency if needed
 
+def requested_fields(request, param):
+    """Return the set of names passed in a comma separated query parameter."""
+    if request is None:
+        return set()
+    value = request.query_params.get(param, '')
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def wants_field(request, name):
+    """True if the client asked for ``name`` through ?expand= or ?fields=."""
+    return name in requested_fields(request, 'expand') or name in requested_fields(request, 'fields')
+
+
+class SparseFieldsMixin:
+    """
+    Lets GET requests trim a serializer's output.
+
+    ``?fields=a,b`` limits the representation to the listed fields. Fields named
+    in ``Meta.deferred_fields`` are left out whenever the view passes
+    ``defer_fields=True`` in the context (list endpoints do), unless the client
+    names them in ``?expand=`` or ``?fields=``. Views are expected to ``defer()``
+    the same columns so they are never loaded or decrypted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+
+        only = requested_fields(request, 'fields')
+        if only:
+            for name in set(self.fields) - only:
+                self.fields.pop(name)
+
+        if self.context.get('defer_fields'):
+            for name in getattr(self.Meta, 'deferred_fields', ()):
+                if name in self.fields and not wants_field(request, name):
+                    self.fields.pop(name)
+
+
+class EvidenceFileField(serializers.FileField):
+    """
+    Accepts uploads like FileField, but represents the stored file as the
+    permission-checked download URL for its report, signed for the caller.
+    """
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get('request')
+        if request is None or not request.user.is_authenticated:
+            return None
+        report_id = value.instance.pk
+        url = reverse('report-evidence', kwargs={'report_id': report_id})
+        url = f"{url}?access={make_access_token(report_id, request.user.pk)}"
+        return request.build_absolute_uri(url)
+
+
+class EvidenceDerivativesMixin(serializers.Serializer):
+    """
+    Adds derivative URLs and extracted metadata for image and video evidence
+    (null until the pipeline has run). Querysets should ``select_related('evidence')``.
+    """
+    thumbnail_url = serializers.SerializerMethodField()
+    preview_url = serializers.SerializerMethodField()
+    sprite_url = serializers.SerializerMethodField()
+    media_metadata = serializers.SerializerMethodField()
+
+    def get_thumbnail_url(self, obj):
+        return self._derivative_url(obj, 'thumbnail')
+
+    def get_preview_url(self, obj):
+        return self._derivative_url(obj, 'preview')
+
+    def get_sprite_url(self, obj):
+        return self._derivative_url(obj, 'sprite')
+
+    def get_media_metadata(self, obj):
+        # Video duration/resolution/codec and sprite layout
+        return obj.evidence.metadata if obj.evidence_id else None
+
+    def _derivative_url(self, obj, variant):
+        if not obj.evidence_id or not getattr(obj.evidence, variant):
+            return None
+        # Served under the report's own permission check, like file_upload
+        request = self.context.get('request')
+        if request is None or not request.user.is_authenticated:
+            return None
+        url = reverse('report-evidence-derivative', kwargs={'report_id': obj.pk, 'variant': variant})
+        url = f"{url}?access={make_access_token(obj.pk, request.user.pk)}"
+        return request.build_absolute_uri(url)
+
+
 # REGISTER SERIALIZER
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -73,8 +173,8 @@ class AdminAccessRequestSerializer(serializers.ModelSerializer):
 
 
 # REPORT SERIALIZER (for users to submit/view their reports)
-class ReportSerializer(serializers.ModelSerializer):
-    file_upload = serializers.FileField(required=False, allow_null=True)
+class ReportSerializer(SparseFieldsMixin, EvidenceDerivativesMixin, serializers.ModelSerializer):
+    file_upload = EvidenceFileField(required=False, allow_null=True, validators=[validate_upload_file])
     # Add a read-only field for the username of the submitter
     submitted_by_username = serializers.CharField(source='submitted_by.username', read_only=True)
 
@@ -83,10 +183,23 @@ class ReportSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'description', 'category', 'status', 'submitted_at',
             'is_anonymous', 'priority_flag', 'file_upload', 'token', 'submitted_by',
-            'submitted_by_username', 'last_status_update', 'reviewed_by'
+            'submitted_by_username', 'last_status_update', 'reviewed_by',
+            'is_image', 'is_video', 'thumbnail_url', 'preview_url', 'sprite_url', 'media_metadata'
         ]
-        read_only_fields = ['id', 'status', 'submitted_at', 'token', 'submitted_by',  'last_status_update', 'reviewed_by']
+        read_only_fields = ['id', 'status', 'submitted_at', 'token', 'submitted_by',  'last_status_update', 'reviewed_by', 'is_image', 'is_video']
+        # Encrypted; only decrypted on detail reads or ?expand=description
+        deferred_fields = ['description']
 
+    def validate(self, attrs):
+        # PolicyUploadHandler aborts a bad upload mid-stream, which leaves no
+        # file in request.data; surface why instead of saving without it.
+        rejection = get_upload_rejection(self.context.get('request'))
+        if rejection:
+            raise serializers.ValidationError(rejection)
+        return attrs
+
+    # Storing the file and referencing its blob must share a transaction (see ContentAddressedStorage._claim)
+    @transaction.atomic
     def create(self, validated_data):
         file_upload = validated_data.pop('file_upload', None)
         report = Report.objects.create(**validated_data)
@@ -95,6 +208,7 @@ class ReportSerializer(serializers.ModelSerializer):
             report.save()
         return report
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         file_upload = validated_data.pop('file_upload', None)
         if file_upload is not None:
@@ -130,7 +244,7 @@ class ReportCommentSerializer(serializers.ModelSerializer):
     def get_is_current_user_sender(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.sender == request.user
+            return obj.sender_id == request.user.pk
         return False
 
     def get_display_sender_name(self, obj):
@@ -138,9 +252,25 @@ class ReportCommentSerializer(serializers.ModelSerializer):
             return "Admin (Internal Note)"
         elif obj.sender.is_admin():
             return obj.sender.username
-        elif obj.sender == obj.report.submitted_by:
+        elif obj.sender_id == obj.report.submitted_by_id:
             return "Anonymous User"
         return obj.sender.username # Fallback
 
     def get_is_sender_admin(self, obj):
         return obj.sender.is_admin()
+
+
+# UPLOAD SESSION SERIALIZER (resumable evidence uploads)
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'size', 'received', 'created_at', 'completed_at']
+        read_only_fields = ['id', 'received', 'created_at', 'completed_at']
+
+    def validate(self, attrs):
+        # Reject unsupported or oversized files before a single byte is sent
+        try:
+            validate_upload_size(attrs['filename'], attrs['size'])
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({'filename': e.messages})
+        return attrs
@@ -0,0 +1,141 @@
+# reports/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import counters, longpoll, rollups
+from .cache import invalidate_token_status
+from .evidence import acquire_blob, blob_for_name, release_blob
+from .media import schedule_processing
+from .models import Counter, Notification, Report, ReportComment
+from .realtime import get_fanout
+
+
+@receiver(post_save, sender=Report)
+@receiver(post_delete, sender=Report)
+def invalidate_report_token(sender, instance, **kwargs):
+    invalidate_token_status(instance.token)
+
+
+@receiver(post_save, sender=Report)
+def track_evidence_blob(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    # Keep Report.evidence and EvidenceBlob.ref_count in step with file_upload
+    if raw or (update_fields is not None and 'file_upload' not in update_fields):
+        return
+    name = instance.file_upload.name or None
+    if name == getattr(instance, '_loaded_file_name', None) and not created:
+        return
+    instance._loaded_file_name = name
+
+    blob = blob_for_name(name) if name else None
+    blob_id = blob.pk if blob else None
+    previous_id = instance.evidence_id
+    if blob_id == previous_id:
+        return
+    is_image, is_video = bool(blob and blob.is_image), bool(blob and blob.is_video)
+    Report.objects.filter(pk=instance.pk).update(evidence=blob_id, is_image=is_image, is_video=is_video)
+    instance.evidence, instance.is_image, instance.is_video = blob, is_image, is_video
+    if blob_id:
+        acquire_blob(blob_id)
+        if blob.processed_at is None:
+            schedule_processing(blob_id)
+    if previous_id:
+        release_blob(previous_id)
+
+
+@receiver(post_delete, sender=Report)
+def release_evidence_blob(sender, instance, **kwargs):
+    if instance.evidence_id:
+        release_blob(instance.evidence_id)
+
+
+@receiver(post_save, sender=Notification)
+def push_notification(sender, instance, created=False, raw=False, **kwargs):
+    # Sockets only hear about rows that actually committed
+    if created and not raw:
+        transaction.on_commit(lambda: get_fanout().publish(instance))
+
+
+@receiver(post_save, sender=Report)
+def count_report(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    current = (instance.submitted_by_id, instance.status)
+    previous = None if created else getattr(instance, '_loaded_counted', None)
+    if created or (previous and previous != current):
+        if previous:
+            counters.count_report(*previous, -1)
+        counters.count_report(*current, 1)
+    instance._loaded_counted = current
+
+
+@receiver(post_delete, sender=Report)
+def uncount_report(sender, instance, **kwargs):
+    counters.count_report(*getattr(instance, '_loaded_counted', (instance.submitted_by_id, instance.status)), -1)
+    Counter.objects.filter(scope=counters.report_scope(instance.pk)).delete()
+
+
+@receiver(post_save, sender=Report)
+def roll_up_report(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    current = instance.stats_key()
+    previous = None if created else getattr(instance, '_loaded_stats_key', None)
+    if created or (previous and previous != current):
+        if previous:
+            rollups.bump(previous, -1)
+        rollups.bump(current, 1)
+    instance._loaded_stats_key = current
+
+
+@receiver(post_delete, sender=Report)
+def unroll_report(sender, instance, **kwargs):
+    rollups.bump(getattr(instance, '_loaded_stats_key', None) or instance.stats_key(), -1)
+
+
+@receiver(post_save, sender=Notification)
+def count_unread_notification(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    was_unread = False if created else not getattr(instance, '_loaded_is_read', instance.is_read)
+    counters.bump(counters.user_scope(instance.user_id), counters.UNREAD, int(not instance.is_read) - int(was_unread))
+    instance._loaded_is_read = instance.is_read
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_unread_notification(sender, instance, **kwargs):
+    if counters.signals_suspended():
+        return
+    if not getattr(instance, '_loaded_is_read', instance.is_read):
+        counters.bump(counters.user_scope(instance.user_id), counters.UNREAD, -1)
+
+
+@receiver(post_save, sender=ReportComment)
+def wake_comment_waiters(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        report_id = instance.report_id
+        transaction.on_commit(lambda: longpoll.comment_posted(report_id))
+
+
+def comment_counter(is_internal):
+    return counters.INTERNAL_COMMENTS if is_internal else counters.COMMENTS
+
+
+@receiver(post_save, sender=ReportComment)
+def count_comment(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    scope = counters.report_scope(instance.report_id)
+    previous = None if created else getattr(instance, '_loaded_is_internal', instance.is_internal)
+    if previous != instance.is_internal:
+        if previous is not None:
+            counters.bump(scope, comment_counter(previous), -1)
+        counters.bump(scope, comment_counter(instance.is_internal), 1)
+    instance._loaded_is_internal = instance.is_internal
+
+
+@receiver(post_delete, sender=ReportComment)
+def uncount_comment(sender, instance, **kwargs):
+    is_internal = getattr(instance, '_loaded_is_internal', instance.is_internal)
+    counters.bump(counters.report_scope(instance.report_id), comment_counter(is_internal), -1)
@@ -0,0 +1,153 @@
+# reports/storage.py
+
+import hashlib
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+
+
+def parse_layouts(value):
+    """Parse ``"1x2,0x0"`` into ``[(1, 2), (0, 0)]`` (depth x width)."""
+    layouts = []
+    for item in value.split(','):
+        if item.strip():
+            depth, width = item.strip().lower().split('x')
+            layouts.append((int(depth), int(width)))
+    return layouts
+
+
+def shard_path(digest, depth=None, width=None):
+    """Directory prefix for a digest, e.g. ``ab/cd`` for depth 2, width 2."""
+    depth = settings.EVIDENCE_SHARD_DEPTH if depth is None else depth
+    width = settings.EVIDENCE_SHARD_WIDTH if width is None else width
+    return '/'.join(digest[i * width:(i + 1) * width] for i in range(depth))
+
+
+def shard_layouts():
+    """The current layout first, then the older ones files may still be in."""
+    current = (settings.EVIDENCE_SHARD_DEPTH, settings.EVIDENCE_SHARD_WIDTH)
+    return [current] + [layout for layout in parse_layouts(settings.EVIDENCE_LEGACY_SHARDS) if layout != current]
+
+
+def join_shard(prefix, digest, filename, layout=None):
+    shards = shard_path(digest, *(layout or (None, None)))
+    return '/'.join(part for part in (prefix, shards, filename) if part)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores each distinct file once, named by the SHA-256 of its content.
+
+    The name handed in by ``upload_to`` only contributes its extension: the
+    content is hashed while it is streamed to a temporary file next to the
+    blob tree and then renamed to ``<prefix>/<shards>/<sha><ext>``, where the
+    shard directories come from EVIDENCE_SHARD_DEPTH/WIDTH. If that blob
+    already exists (in the current or a legacy layout) the copy is dropped
+    and the existing name returned, so identical uploads share one file.
+
+    Names written under an older layout keep working: ``path()`` falls back
+    to wherever the blob lives now, so rows can be rewritten after the files
+    have moved (see the reshard_evidence command).
+    """
+    BLOB_NAME_RE = r'^{prefix}/(?:[0-9a-f]+/)*([0-9a-f]{{64}})(\.\w+)?$'
+
+    def __init__(self, prefix=None, **kwargs):
+        self.prefix = prefix or settings.EVIDENCE_PREFIX
+        super().__init__(**kwargs)
+
+    def blob_name(self, digest, ext, layout=None):
+        return join_shard(self.prefix, digest, f"{digest}{ext.lower()}", layout)
+
+    def digest_from_name(self, name):
+        """Return the SHA-256 a blob name was derived from, or None for other files."""
+        match = re.match(self.BLOB_NAME_RE.format(prefix=re.escape(self.prefix)), name or '')
+        return match.group(1) if match else None
+
+    def candidate_names(self, digest, ext):
+        return [self.blob_name(digest, ext, layout) for layout in shard_layouts()]
+
+    def resolve_name(self, name):
+        """The name a blob is actually stored under, which may differ from ``name`` mid-migration."""
+        if os.path.exists(super().path(name)):
+            return name
+        digest = self.digest_from_name(name)
+        if digest:
+            ext = os.path.splitext(name)[1]
+            for candidate in self.candidate_names(digest, ext):
+                if os.path.exists(super().path(candidate)):
+                    return candidate
+        return name
+
+    def path(self, name):
+        return super().path(self.resolve_name(name))
+
+    def stored_path(self, name):
+        """Filesystem path for exactly ``name``, without legacy-layout fallback."""
+        return super().path(name)
+
+    def get_available_name(self, name, max_length=None):
+        # Names are decided by content in _save; collisions are the point.
+        return name
+
+    def _save(self, name, content):
+        incoming = self.path(f"{self.prefix}/.incoming")
+        os.makedirs(incoming, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=incoming)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            ext = os.path.splitext(name)[1]
+            for existing in self.candidate_names(digest.hexdigest(), ext):
+                # Exact location only: rows are keyed by the name they are stored under
+                if os.path.exists(super().path(existing)) and self._claim(existing, digest.hexdigest()):
+                    return existing
+            blob = self.blob_name(digest.hexdigest(), ext)
+            target = super().path(blob)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp_path, target)
+            if self.file_permissions_mode is not None:
+                os.chmod(target, self.file_permissions_mode)
+            return blob
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _claim(self, name, digest):
+        """
+        Lock the EvidenceBlob row for an existing file (creating it if needed)
+        before its name is reused. purge_blob and the media pipeline take the
+        same lock before deleting a file, so it can't vanish before the
+        caller's transaction, which must enclose the save, references it.
+        Returns False if the file was deleted while we waited.
+        """
+        from .models import EvidenceBlob
+
+        path = super().path(name)
+        try:
+            with transaction.atomic():
+                EvidenceBlob.objects.select_for_update().get_or_create(
+                    file=name, defaults={'sha256': digest, 'size': os.path.getsize(path)}
+                )
+        except FileNotFoundError:
+            return False
+        return os.path.exists(path)
+
+
+def get_evidence_storage():
+    return evidence_storage
+
+
+evidence_storage = ContentAddressedStorage()
@@ -1,3 +1,652 @@
-from django.test import TestCase
+import datetime
+import tempfile
+import zoneinfo
+from collections import Counter
+from contextlib import contextmanager
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections
+from django.http import HttpRequest
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from tasks.models import Task
+from . import analytics, counters, digests, longpoll, rollups
+from .admin import ReportAdmin
+from .cache import ANALYTICS_VERSION_KEY, get_analytics
+from .evidence import make_access_token
+from .media import derivative_name, store_derivative
+from .models import (
+    Counter as CounterRow, EvidenceBlob, Notification, PendingStatusEmail, Report, ReportComment, ReportDailyStats,
+)
+from .storage import evidence_storage
+from .upload_handlers import PolicyUploadHandler
+from .validators import get_upload_policy
+from .views import NotificationViewSet
+
+
+class QueryBudgetMixin:
+    """
+    Test helper that fails when a block issues more queries than its budget.
+
+    Unlike ``assertNumQueries`` the budget is an upper bound, so it can be used
+    to assert that a list endpoint stays O(1) in queries as rows are added.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using='default'):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(
+                f"{i}. {query['sql']}" for i, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f"{executed} queries executed, budget was {budget}:\n{queries}")
+
+
+class ListEndpointQueryTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'pw', role='admin')
+        cls.reporter = User.objects.create_user('reporter', 'reporter@example.com', 'pw')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def seed(self, count):
+        for i in range(count):
+            submitter = User.objects.create_user(f'user{Report.objects.count()}', 'u@example.com')
+            report = Report.objects.create(title=f'Report {i}', category='abuse', submitted_by=submitter)
+            Notification.objects.create(user=self.reporter, report=report, message='Status changed')
+
+    def assertConstantQueries(self, url, user, budget):
+        self.client.force_authenticate(user)
+        for count in (2, 10):
+            self.seed(count)
+            with self.assertMaxQueries(budget):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_report_list(self):
+        self.assertConstantQueries('/api/reports/', self.admin, 1)
+
+    def test_admin_report_list(self):
+        self.assertConstantQueries('/api/admin/reports/', self.admin, 1)
+
+    def test_notification_list(self):
+        self.assertConstantQueries('/api/reports/notifications/', self.reporter, 1)
+
+    def test_comment_list(self):
+        report = Report.objects.create(title='Thread', category='other', submitted_by=self.reporter)
+        for i in range(10):
+            sender = self.reporter if i % 2 else User.objects.create_user(f'staff{i}', 's@example.com', role='admin')
+            ReportComment.objects.create(report=report, sender=sender, message=f'Message {i}')
+        self.client.force_authenticate(self.reporter)
+        # One query for the thread's ETag version, one for the comments
+        with self.assertMaxQueries(2):
+            response = self.client.get(f'/api/reports/{report.id}/comments/')
+        self.assertEqual(len(response.data), 10)
+
+
+class ConditionalGetTests(TestCase):
+    """Unchanged resources are answered with 304 before anything is serialized (or decrypted)."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'pw')
+        self.report = Report.objects.create(
+            title='Report', category='other', description='Secret details', submitted_by=self.user,
+        )
+        Notification.objects.create(user=self.user, report=self.report, message='Status changed')
+        ReportComment.objects.create(report=self.report, sender=self.user, message='Hello')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.urls = [
+            '/api/reports/', f'/api/reports/{self.report.pk}/', '/api/reports/notifications/',
+            f'/api/reports/{self.report.pk}/comments/',
+        ]
+
+    def revalidate(self, url, etag):
+        with CaptureQueriesContext(connections['default']) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        return response, [query['sql'] for query in context.captured_queries]
+
+    def test_not_modified(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                response, queries = self.revalidate(url, etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse([sql for sql in queries if '"description"' in sql])
+
+    def test_status_change(self):
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls[:2]}
+        self.report.status = 'resolved'
+        self.report.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.revalidate(url, etag)[0]
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('resolved', str(response.data))
+
+    def test_notification_read(self):
+        url = self.urls[2]
+        etag = self.client.get(url)['ETag']
+        self.client.post(f'{url}mark_all_read/', {}, format='json')
+        self.assertEqual(self.revalidate(url, etag)[0].status_code, 200)
+
+    def test_new_comment(self):
+        url = self.urls[3]
+        etag = self.client.get(url)['ETag']
+        self.client.post(url, {'message': 'Another'}, format='json')
+        response = self.revalidate(url, etag)[0]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+
+
+class BulkNotificationTests(TestCase):
+    URL = '/api/reports/notifications/'
+
+    def setUp(self):
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'pw')
+        self.other = User.objects.create_user('other', 'other@example.com', 'pw')
+        report = Report.objects.create(title='Report', category='other', submitted_by=self.user)
+        self.mine = [Notification.objects.create(user=self.user, report=report, message=f'Note {i}') for i in range(4)]
+        self.theirs = Notification.objects.create(user=self.other, report=report, message='Not yours')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def unread(self, user):
+        return counters.read_counts(user)['notifications_unread']
+
+    def test_mark_read_ignores_other_users(self):
+        response = self.client.post(f'{self.URL}mark_read/', {'ids': [self.mine[0].pk, self.theirs.pk]}, format='json')
+        self.assertEqual(response.data, {'updated': 1})
+        self.assertFalse(Notification.objects.get(pk=self.theirs.pk).is_read)
+        self.assertEqual((self.unread(self.user), self.unread(self.other)), (3, 1))
+
+    def test_mark_all_read(self):
+        response = self.client.post(f'{self.URL}mark_all_read/', {'up_to_id': self.mine[2].pk}, format='json')
+        self.assertEqual(response.data, {'updated': 3})
+        self.assertEqual(self.unread(self.user), 1)  # arrived after the client's newest
+        response = self.client.post(f'{self.URL}mark_all_read/', {}, format='json')
+        self.assertEqual(response.data, {'updated': 1})
+        self.assertEqual((self.unread(self.user), self.unread(self.other)), (0, 1))
+        self.assertFalse(Notification.objects.get(pk=self.theirs.pk).is_read)
+
+    def test_bulk_delete(self):
+        self.client.post(f'{self.URL}mark_read/', {'ids': [self.mine[0].pk, self.mine[1].pk]}, format='json')
+        ids = [self.mine[0].pk, self.mine[2].pk, self.theirs.pk]  # one read, one unread, one someone else's
+        response = self.client.post(f'{self.URL}bulk_delete/', {'ids': ids}, format='json')
+        self.assertEqual(response.data, {'deleted': 2})
+        self.assertTrue(Notification.objects.filter(pk=self.theirs.pk).exists())
+        self.assertEqual((self.unread(self.user), self.unread(self.other)), (1, 1))
+
+    def test_rejects_bad_ids(self):
+        for ids in ([], 'all', [1, 'two']):
+            with self.subTest(ids=ids):
+                self.assertEqual(self.client.post(f'{self.URL}bulk_delete/', {'ids': ids}, format='json').status_code, 400)
+
+
+class CommentSyncTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.other = User.objects.create_user('other', 'other@example.com', 'pw')
+        self.report = Report.objects.create(title='Thread', category='other', submitted_by=self.owner)
+        self.comment = ReportComment.objects.create(report=self.report, sender=self.owner, message='Hello')
+        self.url = f'/api/reports/{self.report.pk}/comments/'
+        self.client = APIClient()
+
+    def test_other_users_threads(self):
+        self.client.force_authenticate(self.other)
+        with mock.patch.object(longpoll, '_wait') as wait:
+            for params in ({}, {'after_id': 0}, {'after_id': self.comment.pk, 'wait': 5}):
+                with self.subTest(params=params):
+                    self.assertEqual(self.client.get(self.url, params).status_code, 403)
+        wait.assert_not_called()
+        response = self.client.patch(f'{self.url}{self.comment.pk}/', {'message': 'Mine now'}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.post(self.url, {'message': 'Hi'}, format='json').status_code, 403)
+        self.assertEqual(self.client.get('/api/reports/999999/comments/').status_code, 404)
+
+    def test_new_comments(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.get(self.url, {'after_id': 0})
+        self.assertEqual([comment['id'] for comment in response.data], [self.comment.pk])
+
+    def test_waiting_disabled(self):
+        self.client.force_authenticate(self.owner)
+        params = {'after_id': self.comment.pk, 'wait': 5}
+        with mock.patch.object(longpoll, '_wait') as wait, override_settings(COMMENT_LONGPOLL_MAX_WAITERS=0):
+            # Access check, then the comments; no EXISTS rechecks for a wait that won't happen
+            with self.assertNumQueries(2):
+                response = self.client.get(self.url, params)
+        wait.assert_not_called()
+        self.assertEqual(response.data, [])
+        # Not held, so the client paces its next request itself
+        self.assertNotIn('X-Long-Poll', response)
+
+    def test_waiters_are_capped(self):
+        self.client.force_authenticate(self.owner)
+        params = {'after_id': self.comment.pk, 'wait': 5}
+        with mock.patch.object(longpoll, '_wait') as wait, override_settings(COMMENT_LONGPOLL_MAX_WAITERS=1):
+            self.assertEqual(self.client.get(self.url, params)['X-Long-Poll'], 'held')
+            self.assertEqual(wait.call_count, 1)
+            with mock.patch.object(longpoll, '_waiting', 1):  # the one slot is taken
+                self.assertNotIn('X-Long-Poll', self.client.get(self.url, params))
+            self.assertEqual(wait.call_count, 1)
+
+
+class AnalyticsParityTests(TestCase):
+    """The analytics engine against straightforward per-field counts over Report."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'pw', role='admin')
+        statuses = [value for value, _ in Report.STATUS_CHOICES]
+        categories = [value for value, _ in Report.CATEGORY_CHOICES]
+        start = datetime.datetime(2025, 11, 3, 12, tzinfo=datetime.timezone.utc)
+        for i in range(40):
+            # Spread over four months, some right before midnight UTC so other zones see another day
+            submitted_at = start + datetime.timedelta(days=i * 3, hours=11 if i % 4 == 0 else 0, minutes=30)
+            with mock.patch('django.utils.timezone.now', return_value=submitted_at):
+                report = Report.objects.create(
+                    title=f'Report {i}', category=categories[i % len(categories)],
+                    is_premium=i % 3 == 0, priority_flag=i % 5 == 0,
+                )
+            if i % 2:
+                report.status = statuses[i % len(statuses)]
+                report.save()
+        Report.objects.filter(pk=report.pk).update(is_anonymous=False)
+        rollups.rebuild()
+
+    def expected(self, tz, granularity):
+        reports = list(Report.objects.all())
+        periods = Counter(
+            analytics.period_start(timezone.localtime(report.submitted_at, tz).date(), granularity) for report in reports
+        )
+        return {
+            'total_reports': len(reports),
+            'reports_by_status': dict(Counter(report.status for report in reports)),
+            'reports_by_category': dict(Counter(report.category for report in reports)),
+            'premium_vs_free_reports': {True: sum(r.is_premium for r in reports), False: sum(not r.is_premium for r in reports)},
+            'anonymous_vs_identified_reports': dict(Counter(report.is_anonymous for report in reports)),
+            'priority_reports_count': sum(report.priority_flag for report in reports),
+            'periods': dict(periods),
+        }
+
+    def actual(self, **params):
+        result = analytics.compute(**params)
+        result['periods'] = {entry['period']: entry['count'] for entry in result.pop('trends') if entry['count']}
+        del result['granularity']
+        return result
+
+    def test_parity(self):
+        for tz_name in ('UTC', 'Asia/Tokyo', 'America/Los_Angeles'):  # rollup, then scans of Report
+            tz = zoneinfo.ZoneInfo(tz_name)
+            for granularity in analytics.GRANULARITIES:
+                expected = self.expected(tz, granularity)
+                with self.subTest(tz=tz_name, granularity=granularity), self.assertNumQueries(1):
+                    self.assertEqual(self.actual(granularity=granularity, tz=tz), expected)
+
+    def test_range(self):
+        tz = zoneinfo.ZoneInfo('UTC')
+        result = analytics.compute(datetime.date(2025, 12, 1), datetime.date(2025, 12, 31), 'week', tz)
+        december = [r for r in Report.objects.all() if r.submitted_at.date().month == 12]
+        self.assertEqual(result['total_reports'], len(december))
+        self.assertEqual(result['trends'][0]['period'], datetime.date(2025, 12, 1))
+        self.assertEqual(sum(entry['count'] for entry in result['trends']), len(december))
+
+    def test_endpoints(self):
+        cache.clear()  # TestCase never commits, so nothing retires payloads cached by earlier tests
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        for url in ('/api/admin/analytics/', '/api/reports/reports/analytics/'):
+            response = self.client.get(url, {'from': '2025-11-01', 'to': '2026-02-28', 'tz': 'Asia/Tokyo'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['total_reports'], 40)
+            self.assertEqual([entry['month'] for entry in response.data['monthly_trends']],
+                             ['2025-11', '2025-12', '2026-01', '2026-02'])
+            self.assertEqual(self.client.get(url, {'granularity': 'year'}).status_code, 400)
+            self.assertEqual(self.client.get(url, {'tz': 'Mars/Base'}).status_code, 400)
+
+    def test_bounds(self):
+        for params in (
+            {'to': '9999-12-31'}, {'from': '0001-01-01'}, {'from': '1999-12-31', 'to': '2000-01-31'},
+            {'from': '2024-12-31', 'to': '2026-01-01', 'granularity': 'day'},  # 367 days
+            {'from': '2020-01-01', 'to': '2025-01-06', 'granularity': 'week'},  # 262 weeks
+            {'from': '2015-01-01', 'to': '2025-01-31', 'granularity': 'month'},  # 121 months
+            {'from': '2001-01-01', 'granularity': 'month'},  # open-ended: up to today
+        ):
+            with self.subTest(params=params), self.assertRaises(ValidationError):
+                analytics.parse_params(params)
+        for params in (
+            {'from': '2025-01-01', 'to': '2025-12-31', 'granularity': 'day'},
+            {'from': '2020-01-01', 'to': '2024-12-22', 'granularity': 'week'},  # 260 weeks
+            {'from': '2015-01-01', 'to': '2024-12-31', 'granularity': 'month'},
+            {'to': '2025-12-31', 'granularity': 'day'},  # starts at the first report
+        ):
+            with self.subTest(params=params):
+                analytics.parse_params(params)
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        self.assertEqual(client.get('/api/admin/analytics/', {'to': '9999-12-31'}).status_code, 400)
+
+
+class AnalyticsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.compute = mock.Mock(side_effect=lambda: {'total_reports': Report.objects.count()})
+
+    def test_computes_once(self):
+        self.assertEqual(get_analytics('test', self.compute), {'total_reports': 0})
+        self.assertEqual(get_analytics('test', self.compute), {'total_reports': 0})
+        self.assertEqual(self.compute.call_count, 1)
+
+    def test_stale_while_revalidate(self):
+        get_analytics('test', self.compute)
+        cache.set(ANALYTICS_VERSION_KEY, 'newer', None)
+        # Another worker is recomputing: this one answers with the stale payload
+        cache.add('analytics:test:lock', True)
+        self.assertEqual(get_analytics('test', lambda: self.fail('recomputed while locked')), {'total_reports': 0})
+        cache.delete('analytics:test:lock')
+        get_analytics('test', self.compute)
+        self.assertEqual(self.compute.call_count, 2)
+
+    @override_settings(ANALYTICS_CACHE_WAIT=0.1)
+    def test_wait_fallback(self):
+        cache.add('analytics:test:lock', True)
+        # Nothing stale to serve and the holder never finishes: compute without caching
+        self.assertEqual(get_analytics('test', self.compute), {'total_reports': 0})
+        self.assertIsNone(cache.get('analytics:test'))
+        self.assertEqual(self.compute.call_count, 1)
+
+    def test_committed_write_retires_entry(self):
+        get_analytics('test', self.compute)
+        with self.captureOnCommitCallbacks(execute=True):
+            Report.objects.create(title='New', category='other')
+        self.assertEqual(get_analytics('test', self.compute), {'total_reports': 1})
+        self.assertEqual(self.compute.call_count, 2)
+
+
+@override_settings(TASKS_EAGER=False, EMAIL_DIGEST_WINDOW=300, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class StatusDigestTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reporter', 'reporter@example.com', 'pw')
+        self.reports = [
+            Report.objects.create(title=f'Report {i}', category='other', submitted_by=self.user) for i in range(2)
+        ]
+
+    def queue(self, *changes):
+        for report, new_status in changes:
+            digests.queue_status_email(report, new_status)
+        # Past the digest window
+        PendingStatusEmail.objects.update(created_at=timezone.now() - datetime.timedelta(minutes=10))
+
+    def test_changes_are_coalesced(self):
+        self.queue((self.reports[0], 'in_review'), (self.reports[0], 'resolved'), (self.reports[1], 'escalated'))
+        self.assertEqual(Task.objects.filter(name=digests.deliver_status_digests.task_name).count(), 1)
+        totals = digests.deliver_status_digests()
+        self.assertEqual(totals, {'batches': 1, 'messages': 1, 'changes': 3})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['reporter@example.com'])
+        self.assertIn("'Report 0': resolved", mail.outbox[0].body)
+        self.assertNotIn('in_review', mail.outbox[0].body)
+        self.assertFalse(PendingStatusEmail.objects.exists())
+
+    def test_not_due_yet(self):
+        digests.queue_status_email(self.reports[0], 'resolved')
+        self.assertEqual(digests.deliver_status_digests()['messages'], 0)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(PendingStatusEmail.objects.count(), 1)
+
+    def test_send_failure_keeps_rows_pending(self):
+        self.queue((self.reports[0], 'resolved'))
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=SMTPException):
+            with self.assertRaises(SMTPException):
+                digests.deliver_status_digests()
+        self.assertEqual(list(PendingStatusEmail.objects.values_list('claimed_at', flat=True)), [None])
+        # The task's retry sends them
+        digests.deliver_status_digests()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(PendingStatusEmail.objects.exists())
+
+    def test_claimed_rows_are_skipped(self):
+        self.queue((self.reports[0], 'resolved'))
+        PendingStatusEmail.objects.update(claimed_at=timezone.now())  # another run is sending them
+        self.assertEqual(digests.deliver_status_digests()['messages'], 0)
+        # That run died: once its claim is older than the lock timeout the rows are taken over
+        PendingStatusEmail.objects.update(claimed_at=timezone.now() - datetime.timedelta(hours=1))
+        with override_settings(TASKS_LOCK_TIMEOUT=600):
+            self.assertEqual(digests.deliver_status_digests()['messages'], 1)
+        self.assertFalse(PendingStatusEmail.objects.exists())
+
+
+class CounterParityTests(TestCase):
+    """Every write path that moves a counter, against ``counters.rebuild()`` from the source tables."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'pw')
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'pw', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertCountersMatchRebuild(self):
+        current = {(c.scope, c.name): c.value for c in CounterRow.objects.exclude(value=0)}
+        counters.rebuild()
+        self.assertEqual(current, {(c.scope, c.name): c.value for c in CounterRow.objects.all()})
+
+    def test_write_paths(self):
+        reports = [Report.objects.create(title=f'Report {i}', category='other', submitted_by=self.user) for i in range(3)]
+        notes = [Notification.objects.create(user=self.user, report=reports[i % 3], message=f'Note {i}') for i in range(8)]
+        other = Notification.objects.create(user=self.admin, report=reports[0], message='Not yours')
+        url = '/api/reports/notifications/'
+
+        self.client.post(f'{url}{notes[0].pk}/mark_read/')
+        self.client.post(f'{url}mark_read/', {'ids': [notes[1].pk, notes[2].pk, other.pk]}, format='json')
+        self.client.post(f'{url}bulk_delete/', {'ids': [notes[2].pk, notes[3].pk]}, format='json')
+        # A single mark_read that loaded the row before mark_all_read committed
+        stale = Notification.objects.get(pk=notes[4].pk)
+        self.client.post(f'{url}mark_all_read/', {}, format='json')
+        with mock.patch.object(NotificationViewSet, 'get_object', return_value=stale):
+            self.client.post(f'{url}{notes[4].pk}/mark_read/')
+        Notification.objects.create(user=self.user, report=reports[1], message='Later')
+        Notification.objects.get(pk=notes[5].pk).delete()
+        unread_again = Notification.objects.get(pk=notes[6].pk)
+        unread_again.is_read = False
+        unread_again.save()
+
+        reports[0].status = 'resolved'
+        reports[0].save()
+        counters.update_report_status(Report.objects.filter(pk__in=[reports[1].pk, reports[2].pk]), 'escalated')
+        ReportComment.objects.create(report=reports[1], sender=self.admin, message='Public')
+        ReportComment.objects.create(report=reports[1], sender=self.admin, message='Internal', is_internal=True).delete()
+        Report.objects.get(pk=reports[2].pk).delete()
+
+        self.assertCountersMatchRebuild()
+
+
+class AdminActionRollupTests(TestCase):
+    """Each ReportAdmin bulk action must leave the analytics rollup as ``rollups.rebuild()`` would."""
+
+    def rollup(self):
+        # Rows bumped down to zero count for nothing; rebuild() simply doesn't write them
+        return set(ReportDailyStats.objects.exclude(count=0).values_list('day', *rollups.DIMENSIONS, 'count'))
+
+    def test_actions_match_rebuild(self):
+        admin_user = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        self.client.force_login(admin_user)
+        for action in ReportAdmin.actions:
+            with self.subTest(action=action):
+                reports = [
+                    Report.objects.create(title=f'{action} {i}', category='other', priority_flag=i == 0) for i in range(3)
+                ]
+                response = self.client.post('/admin/reports/report/', {
+                    'action': action, '_selected_action': [report.pk for report in reports[:2]],
+                })
+                self.assertEqual(response.status_code, 302)
+                current = self.rollup()
+                rollups.rebuild()
+                self.assertEqual(current, self.rollup())
+
+
+@override_settings(CHUNKED_UPLOAD_DIR=tempfile.mkdtemp())
+class ResumableUploadTests(TestCase):
+    PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 12
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('uploader', 'up@example.com', 'pw'))
+        response = self.client.post('/api/reports/uploads/', {'filename': 'photo.png', 'size': len(self.PNG)})
+        self.assertEqual(response.status_code, 201)
+        self.url = f"/api/reports/uploads/{response.data['id']}/"
+
+    def put(self, body, content_range):
+        return self.client.put(self.url, body, content_type='application/octet-stream', HTTP_CONTENT_RANGE=content_range)
+
+    def test_resume(self):
+        self.assertEqual(self.put(self.PNG[:10], 'bytes 0-9/20').data['received'], 10)
+        # After a dropped connection the client asks where to carry on
+        self.assertEqual(self.client.get(self.url).data['received'], 10)
+        response = self.put(self.PNG[:10], 'bytes 0-9/20')
+        self.assertEqual((response.status_code, response.data['received']), (409, 10))
+        self.assertEqual(self.put(self.PNG[10:], 'bytes 10-19/20').data['received'], 20)
+
+    def test_bad_range(self):
+        for content_range in ('bytes 9-0/20', 'bytes 0-9/21', 'bytes 15-24/20', 'items 0-9/20'):
+            with self.subTest(content_range=content_range):
+                self.assertEqual(self.put(self.PNG[:10], content_range).status_code, 400)
+        self.assertEqual(self.client.get(self.url).data['received'], 0)
+
+    def test_empty_body(self):
+        self.assertEqual(self.put(b'', 'bytes 0-9/20').status_code, 400)
+        self.assertEqual(self.client.get(self.url).data['received'], 0)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class UploadPolicyTests(TestCase):
+    PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 200
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('reporter', 'reporter@example.com', 'pw'))
+
+    def submit(self, name, content):
+        return self.client.post('/api/reports/', {
+            'title': 'Evidence', 'category': 'other', 'description': 'See attached',
+            'file_upload': SimpleUploadedFile(name, content),
+        }, format='multipart')
+
+    def test_accepted(self):
+        self.assertEqual(self.submit('photo.png', self.PNG).status_code, 201)
+
+    def test_rejected_type(self):
+        for name, content in (('tool.exe', b'MZ' + b'\x00' * 50), ('photo.png', b'%PDF-1.4 not an image')):
+            with self.subTest(name=name):
+                response = self.submit(name, content)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('file_upload', response.data)
+        self.assertFalse(Report.objects.exists())
+
+    def test_rejected_size(self):
+        with mock.patch.dict(get_upload_policy().max_sizes_mb, {'Image': 100 / (1024 * 1024)}):
+            response = self.submit('photo.png', self.PNG)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file_upload', response.data)
+        self.assertFalse(Report.objects.exists())
+
+    def test_handler_is_per_view(self):
+        # Other views (e.g. the Django admin) keep Django's own upload handlers
+        self.assertFalse(any(isinstance(h, PolicyUploadHandler) for h in HttpRequest().upload_handlers))
+
+    def test_stored_file_is_not_reopened_on_clean(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.submit('photo.png', self.PNG).status_code, 201)
+        report = Report.objects.get()
+        report.file_upload.storage.delete(report.file_upload.name)
+        report.full_clean()  # would raise FileNotFoundError if the validator sniffed the stored file
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class EvidenceReuseTests(TestCase):
+    def upload(self, content):
+        return Report.objects.create(
+            title='Evidence', category='other', file_upload=SimpleUploadedFile('photo.png', content),
+        )
+
+    def test_reuse_before_pending_purge(self):
+        content = b'\x89PNG\r\n\x1a\n' + b'\x01' * 64
+        first = self.upload(content)
+        blob_id = first.evidence_id
+        # The deleted report's purge is queued for commit; a new upload of the same bytes lands first
+        with self.captureOnCommitCallbacks() as purges:
+            first.delete()
+        second = self.upload(content)
+        for purge in purges:
+            purge()
+        self.assertEqual(second.evidence_id, blob_id)
+        self.assertTrue(evidence_storage.exists(second.file_upload.name))
+        self.assertEqual(EvidenceBlob.objects.get(pk=blob_id).ref_count, 1)
+
+    def test_purge_after_last_reference(self):
+        report = self.upload(b'\x89PNG\r\n\x1a\n' + b'\x02' * 64)
+        name = report.file_upload.name
+        with self.captureOnCommitCallbacks(execute=True):
+            report.delete()
+        self.assertFalse(EvidenceBlob.objects.exists())
+        self.assertFalse(evidence_storage.exists(name))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class EvidenceAccessTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.report = Report.objects.create(
+            title='Evidence', category='other', submitted_by=self.owner,
+            file_upload=SimpleUploadedFile('photo.png', b'\x89PNG\r\n\x1a\n' + b'\x03' * 64),
+        )
+        blob = self.report.evidence
+        blob.thumbnail = store_derivative(derivative_name(blob, 'thumb'), b'thumb')
+        blob.save(update_fields=['thumbnail'])
+        self.url = f'/api/reports/{self.report.pk}/evidence/thumbnail/'
+
+    def test_requires_the_report_check(self):
+        client = APIClient()
+        self.assertEqual(client.get(self.url).status_code, 401)
+        client.force_authenticate(User.objects.create_user('other', 'other@example.com', 'pw'))
+        self.assertEqual(client.get(self.url).status_code, 404)
+        client.force_authenticate(self.owner)
+        self.assertEqual(client.get(f'/api/reports/{self.report.pk}/evidence/sprite/').status_code, 404)
+
+    def test_signed_url(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        url = client.get(f'/api/reports/{self.report.pk}/').data['thumbnail_url']
+        response = APIClient().get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'thumb')
+
+    @override_settings(EVIDENCE_ACCESS_MAX_AGE=3600)
+    def test_cache_policy(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        # Derivatives never change under their hash-based ETag; the original is always revalidated
+        thumbnail = client.get(self.url)['Cache-Control']
+        self.assertEqual(set(thumbnail.split(', ')), {'private', 'max-age=3600', 'immutable'})
+        original = client.get(f'/api/reports/{self.report.pk}/evidence/')['Cache-Control']
+        self.assertEqual(set(original.split(', ')), {'private', 'no-cache'})
+
+    def test_access_link_expires(self):
+        token = make_access_token(self.report.pk, self.owner.pk)
+        url = f'/api/reports/{self.report.pk}/evidence/?access={token}'
+        self.assertEqual(APIClient().get(url).status_code, 200)
+        with override_settings(EVIDENCE_ACCESS_MAX_AGE=-1):
+            self.assertEqual(APIClient().get(url).status_code, 401)
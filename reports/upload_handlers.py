@@ -0,0 +1,77 @@
+# reports/upload_handlers.py
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+from .validators import SNIFF_BYTES, get_upload_policy
+
+
+class PolicyUploadHandler(FileUploadHandler):
+    """
+    Enforces the upload policy while a multipart body is still streaming in.
+
+    Installed at the front of a request's handlers by PolicyUploadMixin, it
+    sees every chunk before the memory/temp-file handlers store it. Unsupported extensions, content whose
+    magic bytes don't match the extension, and files that grow past their
+    kind's limit stop the upload at once; the rest of the body is never read.
+    The reason is left on ``request.upload_rejection`` for the view to report.
+    """
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.policy = get_upload_policy()
+        self.received = 0
+        self.head = b''
+        try:
+            self.kind = self.policy.kind_for(file_name)
+        except ValidationError as e:
+            self.reject(e)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        try:
+            if len(self.head) < SNIFF_BYTES:
+                self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+                if len(self.head) >= SNIFF_BYTES:
+                    self.policy.check_content(self.kind, self.head)
+            self.policy.check_size(self.kind, self.received)
+        except ValidationError as e:
+            self.reject(e)
+        return raw_data
+
+    def file_complete(self, file_size):
+        # Files shorter than the sniff window are checked once they end. The
+        # body has been read by now, so just record the error.
+        if len(self.head) < SNIFF_BYTES:
+            try:
+                self.policy.check_content(self.kind, self.head)
+            except ValidationError as e:
+                self.record(e)
+        return None
+
+    def record(self, error):
+        if self.request is not None:
+            self.request.upload_rejection = {self.field_name: error.messages}
+
+    def reject(self, error):
+        self.record(error)
+        raise StopUpload(connection_reset=True)
+
+
+class PolicyUploadMixin:
+    """
+    For DRF views that accept evidence files: enforce the upload policy while
+    the body streams in. Only these views report ``request.upload_rejection``,
+    so the handler is installed per request rather than in FILE_UPLOAD_HANDLERS.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        django_request = request._request
+        django_request.upload_handlers.insert(0, PolicyUploadHandler(django_request))
+        super().initial(request, *args, **kwargs)
+
+
+def get_upload_rejection(request):
+    """Errors recorded by PolicyUploadHandler for a (DRF or Django) request, if any."""
+    request = getattr(request, '_request', request)
+    return getattr(request, 'upload_rejection', None)
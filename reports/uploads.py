@@ -0,0 +1,117 @@
+# reports/uploads.py
+
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+
+from .models import UploadSession
+from .validators import SNIFF_BYTES, get_upload_policy
+
+# Chunks are copied from the request stream to disk in pieces of this size,
+# so no chunk (let alone a whole file) is ever held in memory.
+COPY_BUFFER_SIZE = 64 * 1024
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadConflict(Exception):
+    """The chunk does not start where the session left off."""
+
+
+class InvalidChunk(Exception):
+    pass
+
+
+def max_chunk_size():
+    return int(settings.CHUNKED_UPLOAD_MAX_CHUNK_MB * 1024 * 1024)
+
+
+def parse_content_range(header):
+    """Parse ``bytes <start>-<end>/<total>`` into ``(start, end, total)`` (end inclusive)."""
+    match = CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        raise InvalidChunk('Content-Range header must be "bytes <start>-<end>/<total>".')
+    start, end, total = (int(value) for value in match.groups())
+    if end < start:
+        raise InvalidChunk('Content-Range end is before its start.')
+    return start, end, total
+
+
+def open_session(session):
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(session.temp_path, 'wb').close()
+
+
+def write_chunk(session, stream, content_range):
+    """
+    Append one chunk from ``stream`` to the session's partial file.
+
+    The chunk must start exactly at ``session.received`` and may not run past
+    the size declared (and validated) when the session was created, so the
+    upload limits hold at every step. Returns the new ``received`` offset.
+    """
+    start, end, total = parse_content_range(content_range)
+    length = end - start + 1
+    if total != session.size:
+        raise InvalidChunk(f'Content-Range total must be {session.size}.')
+    if end >= session.size:
+        raise InvalidChunk('Chunk runs past the declared file size.')
+    if length > max_chunk_size():
+        raise InvalidChunk(f'Chunks may be at most {settings.CHUNKED_UPLOAD_MAX_CHUNK_MB} MB.')
+    if stream is None:
+        # DRF hands over no stream at all for an empty body
+        raise InvalidChunk('Request body is empty.')
+
+    with transaction.atomic():
+        # Hold the row lock while writing, so two PUTs at the same offset can't both write the file
+        received = UploadSession.objects.select_for_update().values_list('received', flat=True).get(pk=session.pk)
+        if start != received:
+            raise UploadConflict
+
+        written = 0
+        with open(session.temp_path, 'r+b') as fh:
+            fh.seek(start)
+            while written < length:
+                data = stream.read(min(COPY_BUFFER_SIZE, length - written))
+                if not data:
+                    break
+                if start == 0 and written == 0:
+                    check_content(session, data[:SNIFF_BYTES])
+                fh.write(data)
+                written += len(data)
+            if stream.read(1):
+                raise InvalidChunk('Request body is longer than its Content-Range.')
+        if written != length:
+            # A short body leaves garbage past `received`; the next chunk overwrites it
+            raise InvalidChunk('Request body is shorter than its Content-Range.')
+
+        UploadSession.objects.filter(pk=session.pk).update(received=start + length)
+    session.received = start + length
+    return session.received
+
+
+def check_content(session, head):
+    # Spoofed files are refused on their first chunk, not after the full upload
+    policy = get_upload_policy()
+    try:
+        policy.check_content(policy.kind_for(session.filename), head)
+    except ValidationError as e:
+        raise InvalidChunk(e.messages[0])
+
+
+def attach_to_report(session, report):
+    """Store the assembled file as ``report.file_upload`` and discard the partial file."""
+    with open(session.temp_path, 'rb') as fh, transaction.atomic():
+        report.file_upload.save(session.filename, File(fh, name=session.filename), save=True)
+    discard(session)
+
+
+def discard(session):
+    try:
+        os.remove(session.temp_path)
+    except FileNotFoundError:
+        pass
@@ -4,20 +4,29 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     ReportViewSet, ReportCertificateView, AdminAnalyticsView,
-      ReportCommentViewSet, NotificationViewSet
+      ReportCommentViewSet, NotificationViewSet, UploadSessionViewSet, EvidenceDerivativeView,
+      EvidenceFileView, CountsView
       
 )
 
 router = DefaultRouter()
+# Prefixed viewsets must be registered before the empty prefix, otherwise the
+# ReportViewSet detail route swallows e.g. /notifications/ as a report pk.
+router.register(r'notifications', NotificationViewSet, basename='notification')
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
 # CHANGE THIS LINE: Remove 'reports' here. It will be added by the main urls.py
 router.register(r'', ReportViewSet, basename='report')
-router.register(r'notifications', NotificationViewSet, basename='notification') # Add this line
 
 
 # For nested comments, it's often clearer to define these explicitly
 # rather than relying on nested routers, especially with the r'' change above.
 # The `report_id` parameter will be correctly passed from the main router's URL structure.
 urlpatterns = [
+    # Before the router: the empty-prefix report routes would match these paths too
+    path('<int:report_id>/evidence/', EvidenceFileView.as_view(), name='report-evidence'),
+    path('<int:report_id>/evidence/<str:variant>/', EvidenceDerivativeView.as_view(), name='report-evidence-derivative'),
+    path('counts/', CountsView.as_view(), name='counts'),
+    path('comments/', ReportCommentViewSet.as_view({'get': 'batch'}), name='report-comment-batch'),
     path('', include(router.urls)), # This now makes ReportViewSet available at the root of reports.urls
 
     # Explicitly define paths for comments, relative to the base 'reports' path
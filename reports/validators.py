@@ -1,26 +1,121 @@
+from functools import lru_cache
+
 from django.core.exceptions import ValidationError
 from decouple import config
 
+
+# Leading bytes of each allowed container. MP4/MOV are ISO base media files,
+# which carry their box type at offset 4 rather than a fixed prefix.
+SIGNATURES = {
+    'Image': (
+        lambda head: head.startswith(b'\xff\xd8\xff'),                 # JPEG
+        lambda head: head.startswith(b'\x89PNG\r\n\x1a\n'),            # PNG
+    ),
+    'Video': (
+        lambda head: head[4:8] in (b'ftyp', b'moov', b'mdat', b'wide', b'free', b'skip'),  # MP4/MOV
+        lambda head: head[:4] == b'RIFF' and head[8:12] == b'AVI ',    # AVI
+    ),
+    'PDF': (
+        lambda head: head.startswith(b'%PDF-'),
+    ),
+}
+
+# Enough of the file to match every signature above
+SNIFF_BYTES = 12
+
+
+class UploadPolicy:
+    """
+    Allowed upload types and their size limits.
+
+    Built once from the environment (see ``get_upload_policy``) and shared by
+    the model validator, the streaming upload handler and chunked uploads.
+    """
+
+    def __init__(self, allowed, max_sizes_mb):
+        # allowed: {kind: set of extensions}, max_sizes_mb: {kind: float}
+        self.allowed = allowed
+        self.max_sizes_mb = max_sizes_mb
+        self.kind_by_ext = {ext: kind for kind, exts in allowed.items() for ext in exts}
+
+    @classmethod
+    def from_env(cls):
+        def extensions(name, default):
+            return {ext.strip().lower() for ext in config(name, default=default).split(',') if ext.strip()}
+
+        return cls(
+            allowed={
+                'Image': extensions('ALLOWED_IMAGE_TYPES', 'jpeg,jpg,png'),
+                'Video': extensions('ALLOWED_VIDEO_TYPES', 'mp4,mov,avi'),
+                'PDF': extensions('ALLOWED_PDF_TYPES', 'pdf'),
+            },
+            max_sizes_mb={
+                'Image': float(config('MAX_IMAGE_SIZE_MB', default=5)),
+                'Video': float(config('MAX_VIDEO_SIZE_MB', default=20)),
+                'PDF': float(config('MAX_PDF_SIZE_MB', default=10)),
+            },
+        )
+
+    def kind_for(self, filename):
+        """Return the upload kind for a file name, or raise ValidationError."""
+        ext = filename.split('.')[-1].lower()
+        kind = self.kind_by_ext.get(ext)
+        if kind is None:
+            raise ValidationError(f'Unsupported file type: {ext}')
+        return kind
+
+    def max_bytes(self, kind):
+        return int(self.max_sizes_mb[kind] * 1024 * 1024)
+
+    def check_size(self, kind, size):
+        if size > self.max_bytes(kind):
+            raise ValidationError(f'{kind} file too large. Max size is {self.max_sizes_mb[kind]} MB')
+
+    def check_content(self, kind, head):
+        """Reject content whose leading bytes don't match its declared kind."""
+        if not any(matches(head) for matches in SIGNATURES[kind]):
+            raise ValidationError(f'File content does not match a supported {kind.lower()} format')
+
+
+@lru_cache(maxsize=1)
+def get_upload_policy():
+    return UploadPolicy.from_env()
+
+
+def get_upload_limit(filename):
+    """
+    Return ``(kind, max_size_mb)`` for a file name's extension.
+
+    Raises ValidationError if the type is not allowed at all.
+    """
+    policy = get_upload_policy()
+    kind = policy.kind_for(filename)
+    return kind, policy.max_sizes_mb[kind]
+
+
+def validate_upload_size(filename, size):
+    policy = get_upload_policy()
+    policy.check_size(policy.kind_for(filename), size)
+
+
 def validate_upload_file(file):
-    ext = file.name.split('.')[-1].lower()
-    size_mb = file.size / (1024 * 1024)
-
-    allowed_images = config("ALLOWED_IMAGE_TYPES", default='jpeg,jpg,png').split(',')
-    allowed_videos = config('ALLOWED_VIDEO_TYPES', default='mp4,mov,avi').split(',')
-    allowed_pdfs = config('ALLOWED_PDF_TYPES', default='pdf').split(',')
-
-    max_image_size = float(config('MAX_IMAGE_SIZE_MB', default=5))
-    max_video_size = float(config('MAX_VIDEO_SIZE_MB', default=20))
-    max_pdf_size = float(config('MAX_PDF_SIZE_MB', default=10))
-
-    if ext in allowed_images:
-        if size_mb > max_image_size:
-            raise ValidationError(f'Image file too large. Max size is {max_image_size} MB')
-    elif ext in allowed_videos:
-        if size_mb > max_video_size:
-            raise ValidationError(f'Video file too large. Max size is {max_video_size} MB')
-    elif ext in allowed_pdfs:
-        if size_mb > max_pdf_size:
-            raise ValidationError(f'PDF file too large. Max size is {max_pdf_size} MB')
-    else:
-        raise ValidationError(f'Unsupported file type: {ext}')
+    policy = get_upload_policy()
+    kind = policy.kind_for(file.name)
+    policy.check_size(kind, file.size)
+
+    position = file.tell() if hasattr(file, 'tell') else None
+    file.seek(0)
+    head = file.read(SNIFF_BYTES)
+    if position is not None:
+        file.seek(position)
+    policy.check_content(kind, head)
+
+
+def validate_new_upload(file):
+    """
+    Model field validator: checks files being uploaded, not ones already in
+    storage, which model forms would otherwise reopen and sniff on every clean.
+    """
+    if getattr(file, '_committed', True):
+        return
+    validate_upload_file(file)
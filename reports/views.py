@@ -6,12 +6,19 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotAuthenticated, PermissionDenied, ValidationError
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files import File
+from django.contrib.auth import get_user_model
 from rest_framework.decorators import action
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Prefetch
+from django.conf import settings
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 import csv
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.core.files.storage import default_storage
 import qrcode
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
@@ -19,11 +26,20 @@ from io import BytesIO
 from mimetypes import guess_type
 from decouple import config
 import os
-from django.core.mail import send_mail
 
 
 # Imports from the current app's models
-from .models import User, Organization, AdminAccessRequest, Report, Notification, ReportComment
+from .models import User, Organization, AdminAccessRequest, Report, Notification, ReportComment, UploadSession
+
+from .pagination import ReportCursorPagination
+from .conditional import ConditionalReadMixin, make_etag, not_modified, set_validators
+from .cache import get_analytics, get_token_status
+from . import analytics, counters, evidence, longpoll, uploads
+from .digests import queue_status_email
+from .sendfile import serve_file
+from .storage import evidence_storage
+from .upload_handlers import PolicyUploadMixin
+from .validators import validate_upload_file
 
 # Imports from the current app's serializers (reports app)
 from .serializers import (
@@ -33,7 +49,9 @@ from .serializers import (
     AdminAccessRequestSerializer,
     ReportSerializer,
     NotificationSerializer,
-    ReportCommentSerializer
+    ReportCommentSerializer,
+    UploadSessionSerializer,
+    wants_field,
 )
 
 # IMPORTANT: Imports from the adminpanel app's serializers
@@ -99,7 +117,7 @@ class AdminAccessRequestReviewView(views.APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        pending_requests = AdminAccessRequest.objects.filter(status='pending')
+        pending_requests = AdminAccessRequest.objects.filter(status='pending').select_related('user')
         serializer = AdminAccessRequestSerializer(pending_requests, many=True)
         return Response(serializer.data)
 
@@ -174,15 +192,26 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 
-class ReportViewSet(viewsets.ModelViewSet):
+class ReportViewSet(PolicyUploadMixin, ConditionalReadMixin, viewsets.ModelViewSet):
     queryset = Report.objects.all()
     serializer_class = ReportSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ReportCursorPagination
 
     def get_queryset(self):
+        # ReportSerializer reads submitted_by.username and the evidence derivatives for every row
+        queryset = Report.objects.select_related('submitted_by', 'evidence')
+        if self.action == 'list' and not wants_field(self.request, 'description'):
+            # Skip loading (and decrypting) descriptions the list won't render
+            queryset = queryset.defer('description')
         if self.request.user.is_admin():
-            return Report.objects.all()
-        return Report.objects.filter(submitted_by=self.request.user)
+            return queryset
+        return queryset.filter(submitted_by=self.request.user)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['defer_fields'] = self.action == 'list'
+        return context
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -191,19 +220,11 @@ class ReportViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='by-token/(?P<token>[^/.]+)', permission_classes=[AllowAny])
     def by_token(self, request, token=None):
-        try:
-            report = Report.objects.get(token=token)
-            return Response({
-                'id': report.id,
-                'title': report.title,
-                'category': report.category,
-                'status': report.status,
-                'submitted_at': report.submitted_at,
-                'priority_flag': report.priority_flag,
-                'file_upload_url': report.file_upload.url if report.file_upload else None,
-            })
-        except Report.DoesNotExist:
+        # Read-through cache; unknown and malformed tokens are answered without a query
+        payload = get_token_status(token)
+        if payload is None:
             return Response({"detail": "Report not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(payload)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def cancel(self, request, pk=None):
@@ -236,42 +257,35 @@ class ReportViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         old_status = instance.status
 
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
+
+            # Check if status changed; the email goes out in the submitter's next digest
+            new_status = serializer.instance.status
+            if old_status != new_status:
+                queue_status_email(serializer.instance, new_status)
 
-        # Check if status changed
-        new_status = serializer.instance.status
-        if old_status != new_status:
-            self.send_status_update_email(serializer.instance)
-
-    def send_status_update_email(self, report):
-        subject = f"Your report '{report.title}' status has been updated!"
-        message = (
-            f"Hey,\n\n"
-            f"Your report titled '{report.title}' has changed status.\n"
-            f"New status: {report.status}\n\n"
-            f"Thanks for keeping us informed!\n"
-            f"— The SafeVoice Team"
-        )
-        recipient = [report.submitted_by.email]
 
-        # Send the email
-        send_mail(subject, message, 'no-reply@safevoice.com', recipient)
 
-        
-        
 # --- Notification ViewSet (for users to manage their notifications) ---
 from django.http import Http404
 from rest_framework.decorators import action
 from rest_framework import permissions, status
 from rest_framework.response import Response
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(ConditionalReadMixin, viewsets.ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+        # NotificationSerializer reads report.title for every row
+        return (
+            Notification.objects.filter(user=self.request.user)
+            .select_related('report')
+            .defer('report__description')  # not rendered; avoid decrypting it per row
+            .order_by('-created_at')
+        )
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def mark_read(self, request, pk=None):
@@ -283,27 +297,339 @@ class NotificationViewSet(viewsets.ModelViewSet):
         if notification.user != request.user:
             return Response({"detail": "Permission denied."}, status=status.HTTP_403_FORBIDDEN)
 
-        notification.is_read = True
-        notification.save()
+        # Through the same conditional UPDATE as the bulk paths: the unread
+        # counter moves by the rows actually changed, so a concurrent
+        # mark_all_read can't make both requests decrement it
+        counters.mark_notifications_read(request.user, Notification.objects.filter(pk=notification.pk))
         return Response({'status': 'Notification marked as read'}, status=status.HTTP_200_OK)
 
+    # Bulk operations: one UPDATE/DELETE scoped to the caller, however many rows
+
+    MAX_BULK_IDS = 1000
+
+    def _requested_ids(self, request):
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids or not all(isinstance(value, int) for value in ids):
+            raise ValidationError({'ids': 'Expected a non-empty list of notification ids.'})
+        if len(ids) > self.MAX_BULK_IDS:
+            raise ValidationError({'ids': f'At most {self.MAX_BULK_IDS} ids per request.'})
+        return ids
+
+    @action(detail=False, methods=['post'], url_path='mark_read', permission_classes=[IsAuthenticated])
+    def mark_read_bulk(self, request):
+        """POST {"ids": [...]} -> {"updated": n}; ids that aren't the caller's are ignored."""
+        ids = self._requested_ids(request)
+        updated = counters.mark_notifications_read(request.user, Notification.objects.filter(pk__in=ids))
+        return Response({'updated': updated})
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def mark_all_read(self, request):
+        """
+        POST {} -> {"updated": n}. With {"up_to_id": id} only notifications up
+        to the newest one the client has shown are marked, so ones that arrive
+        meanwhile stay unread.
+        """
+        queryset = Notification.objects.all()
+        up_to_id = request.data.get('up_to_id')
+        if up_to_id is not None:
+            if not isinstance(up_to_id, int):
+                raise ValidationError({'up_to_id': 'Expected a notification id.'})
+            queryset = queryset.filter(pk__lte=up_to_id)
+        return Response({'updated': counters.mark_notifications_read(request.user, queryset)})
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def bulk_delete(self, request):
+        """POST {"ids": [...]} -> {"deleted": n}."""
+        ids = self._requested_ids(request)
+        deleted = counters.delete_notifications(request.user, Notification.objects.filter(pk__in=ids))
+        return Response({'deleted': deleted})
+
+class CountsView(views.APIView):
+    """
+    Badge counts from the Counter table: unread notifications and reports per
+    status for the user, admin-wide status totals for admins, and comment
+    counts for ``?report_ids=1,2,3``. One query however many rows are behind them.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_REPORT_IDS = 100
+
+    def get(self, request):
+        raw_ids = request.query_params.get('report_ids', '')
+        try:
+            report_ids = [int(value) for value in raw_ids.split(',') if value.strip()]
+        except ValueError:
+            raise ValidationError({'report_ids': 'Expected a comma-separated list of report ids.'})
+        if len(report_ids) > self.MAX_REPORT_IDS:
+            raise ValidationError({'report_ids': f'At most {self.MAX_REPORT_IDS} ids per request.'})
+        return Response(counters.read_counts(request.user, report_ids))
+
+
 # --- ReportComment ViewSet (for communication between users and admins on reports) ---
+class UploadSessionViewSet(viewsets.GenericViewSet):
+    """
+    Resumable evidence uploads.
+
+    POST /uploads/ {filename, size}           -> open a session (type and size checked up front)
+    PUT  /uploads/<id>/ + Content-Range       -> append a raw chunk at the session's offset
+    GET  /uploads/<id>/                       -> current offset, to resume after a failure
+    POST /uploads/<id>/complete/ {report}     -> attach the assembled file to a report
+    DELETE /uploads/<id>/                     -> abandon the upload
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user, completed_at__isnull=True)
+
+    def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = serializer.save(user=request.user)
+        uploads.open_session(session)
+        data = dict(serializer.data, chunk_size=uploads.max_chunk_size())
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None):
+        return Response(self.get_serializer(self.get_object()).data)
+
+    def update(self, request, pk=None):
+        session = self.get_object()
+        try:
+            # Read the raw body stream; request.data would buffer the whole chunk
+            uploads.write_chunk(session, request.stream, request.headers.get('Content-Range'))
+        except uploads.UploadConflict:
+            session.refresh_from_db(fields=['received'])
+            return Response(
+                {"error": "Chunk does not start at the current offset.", "received": session.received},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except uploads.InvalidChunk as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(session).data)
+
+    def destroy(self, request, pk=None):
+        session = self.get_object()
+        uploads.discard(session)
+        session.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        session = self.get_object()
+        if not session.is_complete:
+            return Response(
+                {"error": "Upload is incomplete.", "received": session.received, "size": session.size},
+                status=status.HTTP_409_CONFLICT,
+            )
+        try:
+            report = Report.objects.get(pk=request.data.get('report'), submitted_by=request.user)
+        except (Report.DoesNotExist, TypeError, ValueError):
+            return Response({"error": "Report not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        with open(session.temp_path, 'rb') as fh:
+            try:
+                validate_upload_file(File(fh, name=session.filename))
+            except DjangoValidationError as e:
+                return Response({"error": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+        uploads.attach_to_report(session, report)
+        session.completed_at = timezone.now()
+        session.save(update_fields=['completed_at'])
+        return Response(ReportSerializer(report, context=self.get_serializer_context()).data)
+
+
+class EvidenceAccessMixin:
+    """
+    Evidence is served to the report's submitter and to admins. Accepts the
+    usual JWT header or the signed ``access`` parameter that the serializers
+    put in evidence URLs (media elements can't send headers).
+    """
+    permission_classes = [AllowAny]
+
+    def get_report(self, request, report_id):
+        user = request.user if request.user.is_authenticated else None
+        token = request.query_params.get('access')
+        if user is None and token:
+            user_id = evidence.read_access_token(token, report_id)
+            user = get_user_model().objects.filter(pk=user_id, is_active=True).first() if user_id else None
+        if user is None:
+            raise NotAuthenticated()
+
+        report = (
+            Report.objects.filter(pk=report_id).select_related('evidence')
+            .only('id', 'submitted_by', 'file_upload', 'evidence__sha256', 'evidence__thumbnail',
+                  'evidence__preview', 'evidence__sprite').first()
+        )
+        if report is None or not report.file_upload or not (user.is_admin() or report.submitted_by_id == user.pk):
+            raise Http404
+        return report
+
+    def serve(self, request, storage, name, etag=None, max_age=None):
+        try:
+            path = storage.path(name)
+        except NotImplementedError:
+            # Remote storage: let it serve (or sign) the file itself
+            return HttpResponseRedirect(storage.url(name))
+        if not os.path.exists(path):
+            raise Http404
+        return serve_file(request, path, name, etag=etag, max_age=max_age)
+
+
+class EvidenceFileView(EvidenceAccessMixin, views.APIView):
+    """
+    Serves a report's evidence file. Supports conditional GETs and byte
+    ranges for video seeking.
+    """
+
+    def get(self, request, report_id):
+        report = self.get_report(request, report_id)
+        etag = f'"{report.evidence.sha256}"' if report.evidence_id else None
+        return self.serve(request, evidence_storage, report.file_upload.name, etag=etag)
+
+
+class EvidenceDerivativeView(EvidenceAccessMixin, views.APIView):
+    """
+    Serves a report's image thumbnail, preview or video sprite, under the
+    same report/user check as the evidence itself rather than by bare
+    content hash (which would also reveal whether a file exists).
+    """
+    VARIANTS = ('thumbnail', 'preview', 'sprite')
+
+    def get(self, request, report_id, variant):
+        if variant not in self.VARIANTS:
+            raise Http404
+        report = self.get_report(request, report_id)
+        derivative = getattr(report.evidence, variant) if report.evidence_id else None
+        if not derivative:
+            raise Http404
+        # Named by content hash, so it never changes; the signed URL expires with its token anyway
+        return self.serve(request, default_storage, derivative.name, etag=f'"{report.evidence.sha256}-{variant}"',
+                          max_age=settings.EVIDENCE_ACCESS_MAX_AGE)
+
+
 class ReportCommentViewSet(viewsets.ModelViewSet):
     queryset = ReportComment.objects.all()
     serializer_class = ReportCommentSerializer
     permission_classes = [IsAuthenticated]
 
+    def visible_comments(self, queryset):
+        # Internal notes are for admins only
+        if not self.request.user.is_admin():
+            queryset = queryset.filter(is_internal=False)
+        return queryset
+
     def get_queryset(self):
         report_id = self.kwargs['report_id']
-        queryset = self.queryset.filter(report_id=report_id)
+        # ReportCommentSerializer reads sender and report.submitted_by_id for every row
+        queryset = (
+            self.queryset.filter(report_id=report_id)
+            .select_related('sender', 'report')
+            .defer('report__description')  # not rendered; avoid decrypting it per row
+        )
         if not self.request.user.is_admin():
-            queryset = queryset.filter(is_internal=False)
-        return queryset.order_by('sent_at')
+            queryset = queryset.filter(report__submitted_by=self.request.user)
+        return self.visible_comments(queryset).order_by('sent_at')
+
+    def check_report_access(self):
+        """The report's row version; 404 if it doesn't exist, 403 unless it's the caller's (or an admin)."""
+        row = Report.objects.filter(pk=self.kwargs['report_id']).values_list('updated_at', 'submitted_by_id').first()
+        if row is None:
+            raise Http404
+        version, submitted_by_id = row
+        if not (self.request.user.is_admin() or submitted_by_id == self.request.user.pk):
+            raise PermissionDenied("You do not have permission to view comments on this report.")
+        return version
+
+    def batch(self, request):
+        """
+        GET /comments/?report_ids=1,2,3[&limit=N] -> {"<id>": {"comments": [...], "has_more": bool}}
+
+        The latest ``limit`` visible comments of each report (oldest first), in
+        two queries whatever the number of reports: the reports, then one
+        window-limited prefetch of their comments. Non-admins only get
+        reports they submitted; other ids are left out of the result.
+        """
+        try:
+            report_ids = [int(value) for value in request.query_params.get('report_ids', '').split(',') if value.strip()]
+            limit = int(request.query_params.get('limit') or settings.COMMENT_BATCH_LIMIT)
+        except ValueError:
+            raise ValidationError({'detail': 'report_ids must be a comma-separated list of ids and limit an integer.'})
+        if not report_ids or len(report_ids) > settings.COMMENT_BATCH_MAX_REPORTS:
+            raise ValidationError({'report_ids': f'Between 1 and {settings.COMMENT_BATCH_MAX_REPORTS} report ids.'})
+        limit = min(max(limit, 1), settings.COMMENT_SYNC_PAGE_SIZE)
+
+        reports = Report.objects.filter(pk__in=report_ids).only('id', 'submitted_by_id')
+        if not request.user.is_admin():
+            reports = reports.filter(submitted_by=request.user)
+        # One extra row per report tells us whether there are older ones
+        latest = self.visible_comments(ReportComment.objects.select_related('sender')).order_by('-sent_at', '-id')
+        reports = reports.prefetch_related(Prefetch('comments', queryset=latest[:limit + 1], to_attr='latest_comments'))
+
+        results = {}
+        for report in reports:
+            comments = report.latest_comments[:limit][::-1]
+            results[str(report.pk)] = {
+                'comments': self.get_serializer(comments, many=True, context={'request': request}).data,
+                'has_more': len(report.latest_comments) > limit,
+            }
+        return Response(results)
 
     def list(self, request, *args, **kwargs):
+        after_id, since, wait = self.sync_params(request)
+        # Checked up front so nobody can hold a long-poll open on someone else's thread
+        version = self.check_report_access()
+        if after_id is not None or since is not None:
+            return self.list_new(request, after_id, since, wait)
+
+        # Every comment write bumps the report's row version, so it validates the whole thread
+        etag = make_etag(request.user.pk, request.get_full_path(), version)
+        response = not_modified(request, etag, version)
+        if response is not None:
+            return response
+
         queryset = self.filter_queryset(self.get_queryset())
         serializer = self.get_serializer(queryset, many=True, context={'request': request})
-        return Response(serializer.data)
+        response = Response(serializer.data)
+        set_validators(response, etag, version)
+        return response
+
+    def sync_params(self, request):
+        params = request.query_params
+        try:
+            after_id = int(params['after_id']) if params.get('after_id') else None
+            wait = min(max(float(params.get('wait') or 0), 0), settings.COMMENT_LONGPOLL_MAX_WAIT)
+        except ValueError:
+            raise ValidationError({'detail': 'after_id must be an integer and wait a number of seconds.'})
+        since = None
+        if params.get('since'):
+            since = parse_datetime(params['since'])
+            if since is None:
+                raise ValidationError({'since': 'Expected an ISO 8601 timestamp.'})
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        return after_id, since, wait
+
+    def list_new(self, request, after_id, since, wait):
+        """
+        Only comments after ``after_id`` and/or ``since``, oldest first, at most
+        COMMENT_SYNC_PAGE_SIZE of them (ask again from the last id for more).
+        With ``wait`` the request is held until one arrives or the wait runs out,
+        if the process has a waiter slot free; held responses say so in
+        ``X-Long-Poll: held`` so clients know when to pace themselves instead.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).order_by('sent_at', 'id')
+        if after_id is not None:
+            queryset = queryset.filter(pk__gt=after_id)
+        if since is not None:
+            queryset = queryset.filter(sent_at__gt=since)
+        held = wait and longpoll.wait_for(int(self.kwargs['report_id']), queryset.exists, wait)
+        serializer = self.get_serializer(queryset[:settings.COMMENT_SYNC_PAGE_SIZE], many=True, context={'request': request})
+        response = Response(serializer.data)
+        if held:
+            response['X-Long-Poll'] = 'held'
+        # The answer depends on when it was asked, not just on the URL
+        response['Cache-Control'] = 'no-store'
+        return response
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -317,7 +643,7 @@ class ReportCommentViewSet(viewsets.ModelViewSet):
         is_report_submitter = (report.submitted_by == self.request.user)
 
         if not (self.request.user.is_admin() or is_report_submitter):
-            raise permissions.PermissionDenied("You do not have permission to add comments to this report.")
+            raise PermissionDenied("You do not have permission to add comments to this report.")
 
         is_internal_from_request = self.request.data.get('is_internal', False)
         is_internal_comment = self.request.user.is_admin() and is_internal_from_request
@@ -334,10 +660,10 @@ class ReportCommentViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
 
         if not (comment.sender == request.user or request.user.is_admin()):
-            raise permissions.PermissionDenied("You do not have permission to update this comment.")
+            raise PermissionDenied("You do not have permission to update this comment.")
 
         if 'is_internal' in request.data and not request.user.is_admin():
-            raise permissions.PermissionDenied("Only admins can modify the internal status of comments.")
+            raise PermissionDenied("Only admins can modify the internal status of comments.")
 
         serializer.save()
         return Response(serializer.data)
@@ -393,12 +719,16 @@ class ReportCertificateView(views.APIView):
 # --- Admin Panel Views ---
 
 # FREE + PREMIUM ADMINS: View & filter reports
-class AdminReportListView(generics.ListAPIView):
+class AdminReportListView(ConditionalReadMixin, generics.ListAPIView):
     serializer_class = AdminReportSerializer
     permission_classes = [IsAuthenticated, IsAdminOrPremiumAdmin]
+    pagination_class = ReportCursorPagination
 
     def get_queryset(self):
-        queryset = Report.objects.all()
+        # AdminReportSerializer reads submitted_by.username and the evidence derivatives for every row
+        queryset = Report.objects.select_related('submitted_by', 'evidence')
+        if not wants_field(self.request, 'description'):
+            queryset = queryset.defer('description')
         status_param = self.request.query_params.get('status')
         category_param = self.request.query_params.get('category')
         if status_param:
@@ -407,8 +737,13 @@ class AdminReportListView(generics.ListAPIView):
             queryset = queryset.filter(category=category_param)
         return queryset
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['defer_fields'] = True
+        return context
+
 # FREE + PREMIUM ADMINS: View report detail
-class AdminReportDetailView(generics.RetrieveAPIView):
+class AdminReportDetailView(ConditionalReadMixin, generics.RetrieveAPIView):
     queryset = Report.objects.all()
     serializer_class = AdminReportSerializer
     permission_classes = [IsAuthenticated, IsAdminOrPremiumAdmin]
@@ -421,6 +756,7 @@ class AdminReportUpdateView(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated, IsAdminOrPremiumAdmin]
     lookup_field = 'id'
 
+    @transaction.atomic
     def perform_update(self, serializer):
         if 'status' in serializer.validated_data and serializer.validated_data['status'] != serializer.instance.status:
             serializer.validated_data['last_status_update'] = timezone.now()
@@ -431,6 +767,7 @@ class AdminReportUpdateView(generics.UpdateAPIView):
                     report=serializer.instance,
                     message=f"Your report '{serializer.instance.title}' status changed to {serializer.validated_data['status']}"
                 )
+                queue_status_email(serializer.instance, serializer.validated_data['status'])
         super().perform_update(serializer)
 
 # FREE + PREMIUM ADMINS: Analytics (basic summary for free tier)
@@ -439,79 +776,21 @@ class AdminAnalyticsView(generics.GenericAPIView):
     serializer_class = ReportAnalyticsSerializer
 
     def get(self, request, *args, **kwargs):
-        # >>> START DEBUG PRINTS <<<
-        print(f"\n--- Entering AdminAnalyticsView.get() ---")
-        print(f"Request user: {request.user}")
-        print(f"Is user authenticated? {request.user.is_authenticated}")
-        if request.user.is_authenticated:
-            print(f"User role: {request.user.role}")
-            print(f"User plan: {request.user.plan}")
-        else:
-            print("User is NOT authenticated in AdminAnalyticsView.")
-        # >>> END DEBUG PRINTS (for initial check) <<<
-
-        total_reports = Report.objects.count()
-        reports_by_status_query = Report.objects.values('status').annotate(count=Count('status')).order_by('status')
-        reports_by_status = {item['status']: item['count'] for item in reports_by_status_query}
-
-        reports_by_category_query = Report.objects.values('category').annotate(count=Count('category')).order_by('category')
-        reports_by_category = {item['category']: item['count'] for item in reports_by_category_query}
-
-        today = timezone.now()
-        months_data = []
-        for i in range(6):
-            month_start = (today - timezone.timedelta(days=30*i)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            if month_start.month == 12:
-                next_month_start = month_start.replace(year=month_start.year + 1, month=1)
-            else:
-                next_month_start = month_start.replace(month=month_start.month + 1)
-            month_end = next_month_start - timezone.timedelta(microseconds=1)
-            
-            reports_in_month = Report.objects.filter(submitted_at__gte=month_start, submitted_at__lt=month_end).count()
-            months_data.append({
-                'month': month_start.strftime('%Y-%m'),
-                'count': reports_in_month
-            })
-        months_data.reverse()
-
-        premium_vs_free_reports = {}
-        # Corrected: Use 'is_premium' field from Report model.
-        # Serializer expects keys True (for premium) and False (for free)
-        premium_reports_count = Report.objects.filter(is_premium=True).count()
-        # total_reports is already calculated
-        free_reports_count = total_reports - premium_reports_count
-
-        premium_vs_free_reports = {
-            True: premium_reports_count,  # True represents premium reports
-            False: free_reports_count     # False represents non-premium (free) reports
-        }
-        anonymous_vs_identified_reports = dict(Report.objects.values('is_anonymous').annotate(count=Count('is_anonymous')).order_by('is_anonymous').values_list('is_anonymous', 'count'))
-
-        priority_reports_count = Report.objects.filter(priority_flag=True).count()
-
-        data = {
-            'total_reports': total_reports,
-            'reports_by_category': reports_by_category,
-            'reports_by_status': reports_by_status,
-            'monthly_trends': months_data, # Match ReportAnalyticsSerializer field name
-            'premium_vs_free_reports': premium_vs_free_reports,
-            'anonymous_vs_identified_reports': anonymous_vs_identified_reports,
-            'priority_reports_count': priority_reports_count,
-        }
-
-        # >>> START DEBUG PRINTS FOR SERIALIZER <<<
-        print(f"Data prepared for serializer: {data}")
-        serializer = ReportAnalyticsSerializer(data=data)
-        
-        if not serializer.is_valid():
-            print(f"Serializer validation FAILED!")
-            print(f"Serializer errors: {serializer.errors}")
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            print(f"Serializer validation PASSED.")
-        # >>> END DEBUG PRINTS FOR SERIALIZER <<<
-
-        return Response(serializer.data)
+        # ?from=&to=&granularity=day|week|month&tz=; by default all reports,
+        # with trends for the current month and the five before it
+        params = analytics.parse_params(request.query_params)
+        if params['end'] is None:
+            params['end'] = timezone.localdate(timezone=params['tz'])
+        trends_since = None if params['start'] else analytics.months_back(6, params['tz'])
+
+        def build():
+            data = analytics.compute(**params, trends_since=trends_since)
+            data['monthly_trends'] = analytics.monthly_trends(data)  # Match ReportAnalyticsSerializer field name
+            # Our own numbers: represent them, there is nothing to validate
+            return ReportAnalyticsSerializer(instance=data).data
+
+        name = analytics.cache_name('reports', params, trends_since=trends_since)
+        return Response(get_analytics(name, build))
 
 # PREMIUM ADMINS ONLY: View all users
 class UserListView(generics.ListAPIView):
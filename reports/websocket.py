@@ -0,0 +1,88 @@
+# reports/websocket.py
+#
+# Plain ASGI WebSocket endpoint for notification push, mounted next to the
+# Django application in safevoice/asgi.py:
+#
+#   ws://<host>/ws/notifications/<user_id>/?token=<SimpleJWT access token>
+#
+# Browsers can't set headers on a WebSocket handshake, hence the query string.
+
+import asyncio
+import json
+import re
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .realtime import get_fanout
+
+PATH_RE = re.compile(r'^/ws/notifications/(?P<user_id>\d+)/?$')
+
+# Application close codes (4000-4999) the client can tell apart
+CLOSE_UNAUTHENTICATED = 4401
+CLOSE_FORBIDDEN = 4403
+CLOSE_NOT_FOUND = 4404
+
+
+def is_notification_socket(scope):
+    return scope['type'] == 'websocket' and PATH_RE.match(scope['path']) is not None
+
+
+@sync_to_async
+def authenticate(raw_token):
+    """Return ``(user, expires_at)`` for a valid access token, or ``(None, None)``."""
+    auth = JWTAuthentication()
+    try:
+        token = auth.get_validated_token(raw_token)
+        user = auth.get_user(token)
+    except (InvalidToken, AuthenticationFailed):
+        return None, None
+    return user, token['exp']
+
+
+async def notifications_socket(scope, receive, send):
+    match = PATH_RE.match(scope['path'])
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    if match is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+        return
+
+    query = parse_qs(scope.get('query_string', b'').decode())
+    user, expires_at = await authenticate(query.get('token', [''])[0])
+    if user is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHENTICATED})
+        return
+    if user.pk != int(match['user_id']):
+        await send({'type': 'websocket.close', 'code': CLOSE_FORBIDDEN})
+        return
+
+    await send({'type': 'websocket.accept'})
+    fanout = get_fanout()
+    queue = fanout.subscribe(user.pk)
+    incoming = asyncio.ensure_future(receive())
+    outgoing = asyncio.ensure_future(queue.get())
+    try:
+        while True:
+            # The socket lives no longer than the token that opened it
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHENTICATED})
+                break
+            done, _ = await asyncio.wait({incoming, outgoing}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if incoming in done:
+                if incoming.result()['type'] == 'websocket.disconnect':
+                    break
+                # Nothing is expected from the client; ignore whatever it sends
+                incoming = asyncio.ensure_future(receive())
+            if outgoing in done:
+                await send({'type': 'websocket.send', 'text': json.dumps(outgoing.result(), default=str)})
+                outgoing = asyncio.ensure_future(queue.get())
+    finally:
+        fanout.unsubscribe(user.pk, queue)
+        incoming.cancel()
+        outgoing.cancel()
@@ -32,13 +32,29 @@ const NotificationDropdown = () => {
         };
     }, [handleClickOutside]); // Re-run effect if handleClickOutside changes (though useCallback makes it stable)
 
+    // Initial badge count, without loading the notification list itself
+    useEffect(() => {
+        if (!isLoggedIn) return;
+        const token = localStorage.getItem('accessToken');
+        fetch('/api/reports/counts/', {
+            headers: { 'Authorization': `Bearer ${token}` }
+        })
+            .then(response => (response.ok ? response.json() : null))
+            .then(counts => {
+                if (counts) setUnreadCount(counts.notifications_unread);
+            })
+            .catch(err => console.error('Error fetching counts:', err));
+    }, [isLoggedIn]);
+
     // Placeholder for WebSocket connection
     useEffect(() => {
         let ws = null;
 
         if (isLoggedIn && user && user.id) {
             const userId = user.id; // Get user ID from AuthContext
-            const WS_URL = `ws://localhost:8000/ws/notifications/${userId}/`; // Your WebSocket URL
+            const token = localStorage.getItem('accessToken');
+            // Browsers can't send an Authorization header on a WebSocket, so the JWT goes in the query string
+            const WS_URL = `ws://localhost:8000/ws/notifications/${userId}/?token=${encodeURIComponent(token)}`; // Your WebSocket URL
 
             ws = new WebSocket(WS_URL);
 
@@ -74,26 +74,22 @@ const NotificationsList = ({ onNotificationRead }) => {
     }, [onNotificationRead, fetchNotifications]);
 
     const markAllNotificationsAsRead = useCallback(async () => {
-        const unreadNotifications = notifications.filter(n => !n.is_read);
         const token = localStorage.getItem('accessToken'); // Assuming token is here
+        // Only what's on screen: anything newer that arrived meanwhile stays unread
+        const upToId = notifications.reduce((max, n) => Math.max(max, n.id), 0);
 
-        const markPromises = unreadNotifications.map(n => 
-            fetch(`/api/notifications/${n.id}/mark_read/`, {
+        try {
+            const response = await fetch('/api/notifications/mark_all_read/', {
                 method: 'POST',
                 headers: {
                     'Authorization': `Bearer ${token}`,
                     'Content-Type': 'application/json'
-                }
-            }).then(response => {
-                if (!response.ok) {
-                    throw new Error(`HTTP error! status: ${response.status}`);
-                }
-                return response.json();
-            })
-        );
-
-        try {
-            await Promise.all(markPromises); // Mark all unread notifications as read
+                },
+                body: JSON.stringify({ up_to_id: upToId })
+            });
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
             fetchNotifications(); // Re-fetch all to ensure consistent state
             if (onNotificationRead) { // Notify parent
                 onNotificationRead();
@@ -0,0 +1,74 @@
+// src/components/useCommentSync.js
+import { useEffect, useRef } from 'react';
+import axios from 'axios';
+
+const LONG_POLL_SECONDS = 10;
+const RETRY_DELAY_MS = 5000;
+// Between requests the server answered without holding (long-polling is off or busy)
+const POLL_INTERVAL_MS = 10000;
+
+const requestNewComments = (reportId, afterId, { wait = 0, signal } = {}) =>
+  axios.get(`/api/reports/${reportId}/comments/`, {
+    params: { after_id: afterId, ...(wait ? { wait } : {}) },
+    headers: { Authorization: `Bearer ${localStorage.getItem('accessToken')}` },
+    signal,
+  });
+
+// Fetch only the comments newer than afterId; with wait, the server may hold the
+// request until one arrives (or the wait runs out and it answers []).
+export const fetchNewComments = async (reportId, afterId, options) =>
+  (await requestNewComments(reportId, afterId, options)).data;
+
+export const lastCommentId = (comments) => comments.reduce((max, c) => Math.max(max, c.id), 0);
+
+// Append comments that aren't in the list yet (a sent message can also come back from the poll)
+export const mergeComments = (setComments, incoming) => {
+  if (!incoming.length) return;
+  setComments((prev) => {
+    const seen = new Set(prev.map((c) => c.id));
+    return [...prev, ...incoming.filter((c) => !seen.has(c.id))];
+  });
+};
+
+const sleep = (ms, signal) =>
+  new Promise((resolve) => {
+    const timer = setTimeout(resolve, ms);
+    signal.addEventListener('abort', () => { clearTimeout(timer); resolve(); }, { once: true });
+  });
+
+// Keep a loaded thread up to date while `enabled`: a long-poll loop when the
+// server holds requests (X-Long-Poll: held), plain polling every
+// POLL_INTERVAL_MS when it doesn't
+const useCommentSync = (reportId, comments, setComments, enabled = true) => {
+  const lastIdRef = useRef(0);
+  lastIdRef.current = lastCommentId(comments);
+
+  useEffect(() => {
+    if (!reportId || !enabled) return undefined;
+    const controller = new AbortController();
+
+    const poll = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          const response = await requestNewComments(reportId, lastIdRef.current, {
+            wait: LONG_POLL_SECONDS,
+            signal: controller.signal,
+          });
+          mergeComments(setComments, response.data);
+          if (response.headers['x-long-poll'] !== 'held') {
+            await sleep(POLL_INTERVAL_MS, controller.signal);
+          }
+        } catch (err) {
+          if (axios.isCancel(err)) return;
+          console.error('Comment sync failed, retrying:', err);
+          await sleep(RETRY_DELAY_MS, controller.signal);
+        }
+      }
+    };
+    poll();
+
+    return () => controller.abort();
+  }, [reportId, enabled, setComments]);
+};
+
+export default useCommentSync;
@@ -21,6 +21,9 @@ const AdminDashboard = () => {
   const [updatingReportId, setUpdatingReportId] = useState(null);
   const [analytics, setAnalytics] = useState(null);
   const [analyticsLoading, setAnalyticsLoading] = useState(true);
+  // Cursor URL of the next page of reports, if any
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Get unique categories from reports
   const uniqueCategories = [...new Set(reports.map(report => report.category))];
@@ -37,7 +40,8 @@ const AdminDashboard = () => {
           Authorization: `Bearer ${localStorage.getItem('accessToken')}`,
         },
       });
-      setReports(response.data);
+      setReports(response.data.results); // Cursor-paginated response
+      setNextPage(response.data.next);
     } catch (err) {
       console.error("Failed to fetch reports:", err);
       setError('Could not load reports. Please ensure you are logged in as an admin.');
@@ -46,6 +50,26 @@ const AdminDashboard = () => {
     }
   }, [filterStatus]);
 
+  // Append the next cursor page to the list
+  const loadMoreReports = async () => {
+    if (!nextPage) return;
+    setLoadingMore(true);
+    try {
+      const response = await axios.get(nextPage, {
+        headers: {
+          Authorization: `Bearer ${localStorage.getItem('accessToken')}`,
+        },
+      });
+      setReports(prev => [...prev, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (err) {
+      console.error("Failed to load more reports:", err);
+      setError('Could not load more reports.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const fetchAnalytics = useCallback(async () => {
     setAnalyticsLoading(true);
     try {
@@ -89,8 +113,22 @@ const AdminDashboard = () => {
     }
   };
 
-  const toggleExpand = (id) => {
+  const toggleExpand = async (id) => {
     setExpandedId(expandedId === id ? null : id);
+    const report = reports.find(r => r.id === id);
+    // The list omits the encrypted description; load it from the detail endpoint on first expand
+    if (expandedId !== id && report && report.description === undefined) {
+      try {
+        const response = await axios.get(`/api/admin/reports/${id}/`, {
+          headers: {
+            Authorization: `Bearer ${localStorage.getItem('accessToken')}`,
+          },
+        });
+        setReports(prev => prev.map(r => (r.id === id ? { ...r, description: response.data.description } : r)));
+      } catch (err) {
+        console.error("Failed to fetch report details:", err);
+      }
+    }
   };
 
   const handleViewDetails = (reportId) => {
@@ -100,7 +138,7 @@ const AdminDashboard = () => {
   const sortedAndFilteredReports = reports
     .filter(report => {
       const matchesSearch = report.title.toLowerCase().includes(searchQuery.toLowerCase()) ||
-        report.description.toLowerCase().includes(searchQuery.toLowerCase()) ||
+        (report.description || '').toLowerCase().includes(searchQuery.toLowerCase()) ||
         report.category.toLowerCase().includes(searchQuery.toLowerCase());
       const matchesCategory = filterCategory === 'all' || report.category === filterCategory;
       return matchesSearch && matchesCategory;
@@ -387,6 +425,15 @@ const AdminDashboard = () => {
                       </span>
                     </div>
 
+                    {report.thumbnail_url && (
+                      <img
+                        src={report.thumbnail_url}
+                        alt="Evidence thumbnail"
+                        loading="lazy"
+                        className="w-full h-32 object-cover rounded-lg mb-4 border border-gray-600/50"
+                      />
+                    )}
+
                     <div className="space-y-3 text-sm">
                       <div className="flex items-center gap-2 text-gray-300">
                         <Award className="h-4 w-4 text-blue-400" />
@@ -439,6 +486,18 @@ const AdminDashboard = () => {
                             </div>
                           )}
 
+                          {report.media_metadata && report.media_metadata.pages && (
+                            <div className="p-3 bg-gray-700/30 rounded-lg border border-gray-600/30 text-xs text-gray-300 space-y-1">
+                              <p>
+                                <span className="font-medium">PDF:</span> {report.media_metadata.pages} page(s)
+                                {report.media_metadata.document?.title && ` · ${report.media_metadata.document.title}`}
+                              </p>
+                              {report.media_metadata.first_page_text && (
+                                <p className="italic text-gray-400">{report.media_metadata.first_page_text}</p>
+                              )}
+                            </div>
+                          )}
+
                           {report.request_type === 'organization' && (
                             <div className="p-3 bg-gray-700/30 rounded-lg border border-gray-600/30">
                               <h4 className="font-semibold text-white mb-2">Organization Details:</h4>
@@ -535,6 +594,18 @@ const AdminDashboard = () => {
               ))}
             </div>
           )}
+          {!loading && nextPage && (
+            <div className="flex justify-center mt-8">
+              <button
+                onClick={loadMoreReports}
+                disabled={loadingMore}
+                className="bg-blue-600 hover:bg-blue-500 disabled:opacity-50 text-white font-medium py-3 px-6 rounded-xl transition-all flex items-center gap-2"
+              >
+                {loadingMore && <Loader2 className="h-5 w-5 animate-spin" />}
+                Load more reports
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useCallback } from 'react';
+import React, { useEffect, useState, useCallback, useRef } from 'react';
 import axios from 'axios';
 import {
   FileText, MessageSquare, PlusCircle, Send, XCircle, Loader2, Info, ArrowLeft,
@@ -6,6 +6,7 @@ import {
   Download, Trash2, Ban
 } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
+import useCommentSync, { fetchNewComments, lastCommentId, mergeComments } from '../components/useCommentSync';
 
 const MyReportsPage = () => {
   const navigate = useNavigate();
@@ -18,24 +19,48 @@ const MyReportsPage = () => {
   const [errorComments, setErrorComments] = useState('');
   const [newComment, setNewComment] = useState('');
   const [sendingComment, setSendingComment] = useState(false);
+  // Cursor URL of the next page of reports, if any
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Threads preloaded in one batched request, keyed by report id
+  const preloadedThreads = useRef({});
 
-  // Fetch reports submitted by the current user
-  const fetchMyReports = useCallback(async () => {
-    setLoadingReports(true);
+  // Load the comment threads of all listed reports in a single round-trip
+  const preloadThreads = useCallback(async (reportIds) => {
+    if (!reportIds.length) return;
+    try {
+      const response = await axios.get('/api/reports/comments/', {
+        params: { report_ids: reportIds.slice(0, 50).join(',') },
+        headers: {
+          Authorization: `Bearer ${localStorage.getItem('accessToken')}`,
+        },
+      });
+      Object.entries(response.data).forEach(([id, thread]) => {
+        // Partial threads are fetched in full when opened
+        if (!thread.has_more) preloadedThreads.current[id] = thread.comments;
+      });
+    } catch (err) {
+      console.error('Error preloading comments:', err); // Threads then load individually
+    }
+  }, []);
+
+  // Fetch reports submitted by the current user; with `pageUrl`, append that cursor page
+  const fetchMyReports = useCallback(async (pageUrl = null) => {
+    if (pageUrl) setLoadingMore(true); else setLoadingReports(true);
     setErrorReports('');
     try {
       // The ReportViewSet's get_queryset should filter by submitted_by=request.user automatically for non-admins.
-      const response = await axios.get('/api/reports/', {
+      // This page renders descriptions inline, so ask the list to include them
+      const response = await axios.get(pageUrl || '/api/reports/?expand=description', {
         headers: {
           Authorization: `Bearer ${localStorage.getItem('accessToken')}`,
         },
       });
-      // Ensure response.data is an array before attempting to sort
-      const reportsArray = Array.isArray(response.data) ? response.data : []; // Default to empty array if not array
-      
-      // Sort reports by newest first
-      const sortedReports = [...reportsArray].sort((a, b) => new Date(b.submitted_at) - new Date(a.submitted_at));
-      setReports(sortedReports);
+      // The list endpoint is cursor-paginated (newest first): rows live under `results`, the next page under `next`
+      const reportsArray = Array.isArray(response.data?.results) ? response.data.results : []; // Default to empty array if not array
+      setReports(prevReports => (pageUrl ? [...prevReports, ...reportsArray] : reportsArray));
+      setNextPage(response.data?.next || null);
+      preloadThreads(reportsArray.map((r) => r.id));
     } catch (err) {
       console.error('Error fetching user reports:', err);
       setErrorReports('Failed to fetch your reports. Please try again.');
@@ -43,12 +68,19 @@ const MyReportsPage = () => {
         navigate('/login'); // Redirect to login if token is invalid
       }
     } finally {
-      setLoadingReports(false);
+      if (pageUrl) setLoadingMore(false); else setLoadingReports(false);
     }
-  }, [navigate]);
+  }, [navigate, preloadThreads]);
 
   // Fetch comments for a specific report
   const fetchComments = useCallback(async (reportId) => {
+    const preloaded = preloadedThreads.current[reportId];
+    if (preloaded) {
+      // Used once; the long-poll brings it up to date from here
+      delete preloadedThreads.current[reportId];
+      setComments(preloaded);
+      return;
+    }
     setLoadingComments(true);
     setErrorComments('');
     try {
@@ -83,7 +115,8 @@ const MyReportsPage = () => {
         }
       );
       setNewComment(''); // Clear input
-      fetchComments(selectedReport.id); // Refresh comments list
+      // Only pull what's new since the last comment we have, not the whole thread
+      mergeComments(setComments, await fetchNewComments(selectedReport.id, lastCommentId(comments)));
     } catch (err) {
       console.error('Error sending comment:', err);
       setErrorComments('Failed to send comment. Please try again.');
@@ -198,6 +231,9 @@ const MyReportsPage = () => {
     }
   }, [selectedReport, fetchComments]);
 
+  // Live updates for the open thread once its first page is in
+  useCommentSync(selectedReport?.id, comments, setComments, !loadingComments && !errorComments);
+
   // Function to navigate back to the reports list
   const handleBackToReports = () => {
     setSelectedReport(null);
@@ -496,6 +532,16 @@ const MyReportsPage = () => {
                   </div>
                 </div>
               ))}
+              {nextPage && (
+                <button
+                  onClick={() => fetchMyReports(nextPage)}
+                  disabled={loadingMore}
+                  className="w-full bg-gray-800 hover:bg-gray-700 disabled:opacity-50 text-blue-300 font-medium py-3 px-6 rounded-xl border border-gray-700 transition-all flex items-center justify-center"
+                >
+                  {loadingMore && <Loader2 className="h-5 w-5 mr-2 animate-spin" />}
+                  Load older reports
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -4,6 +4,49 @@ import { useNavigate } from 'react-router-dom';
 import { FileUp, Send, Loader2, CheckCircle, XCircle, AlertTriangle, Shield, Star, Upload } from 'lucide-react';
 import { jwtDecode } from 'jwt-decode';
 
+const MAX_CHUNK_RETRIES = 5;
+
+// Uploads a file through /api/reports/uploads/ in chunks and returns the
+// session id. After a failed chunk the server's offset is re-read and the
+// upload resumes from there.
+const uploadInChunks = async (file, headers, onProgress) => {
+  const { data: session } = await axios.post(
+    '/api/reports/uploads/',
+    { filename: file.name, size: file.size },
+    { headers }
+  );
+  let offset = session.received;
+  let failures = 0;
+
+  while (offset < file.size) {
+    const end = Math.min(offset + session.chunk_size, file.size);
+    try {
+      const { data } = await axios.put(`/api/reports/uploads/${session.id}/`, file.slice(offset, end), {
+        headers: {
+          ...headers,
+          'Content-Type': 'application/octet-stream',
+          'Content-Range': `bytes ${offset}-${end - 1}/${file.size}`,
+        },
+      });
+      offset = data.received;
+      failures = 0;
+      onProgress(offset, file.size);
+    } catch (err) {
+      if (err.response && err.response.status === 400) throw err;
+      failures += 1;
+      if (failures > MAX_CHUNK_RETRIES) throw err;
+      await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** (failures - 1)));
+      try {
+        const { data } = await axios.get(`/api/reports/uploads/${session.id}/`, { headers });
+        offset = data.received;
+      } catch {
+        // Keep the last known offset and retry the same chunk
+      }
+    }
+  }
+  return session.id;
+};
+
 const SubmitReport = () => {
   const navigate = useNavigate();
   const [formData, setFormData] = useState({
@@ -14,6 +57,7 @@ const SubmitReport = () => {
     priority_flag: false, // Default to false, making it opt-in
   });
   const [loading, setLoading] = useState(false);
+  const [uploadProgress, setUploadProgress] = useState(null);
   const [message, setMessage] = useState({ type: '', text: '' });
   const [isAuthenticatedUser, setisAuthenticatedUser] = useState(false);
 
@@ -75,25 +119,37 @@ const SubmitReport = () => {
       return;
     }
 
+    const authHeaders = { Authorization: `Bearer ${accessToken}` };
+
     const formDataToSend = new FormData();
     formDataToSend.append('title', formData.title);
     formDataToSend.append('category', formData.category);
     formDataToSend.append('description', formData.description);
-    if (formData.file_upload) {
-      formDataToSend.append('file_upload', formData.file_upload);
-    }
     // Send priority_flag based on its current state for all users
     formDataToSend.append('priority_flag', formData.priority_flag);
 
     try {
+      // Evidence goes through the resumable upload API first, so a dropped
+      // connection only costs the current chunk rather than the whole file.
+      let uploadId = null;
+      if (formData.file_upload) {
+        uploadId = await uploadInChunks(formData.file_upload, authHeaders, (sent, total) =>
+          setUploadProgress(Math.round((sent / total) * 100))
+        );
+      }
+
       // CORRECTED LINE: Ensure the URL is '/api/reports/'
       const response = await axios.post('/api/reports/', formDataToSend, {
         headers: {
           'Content-Type': 'multipart/form-data',
-          Authorization: `Bearer ${accessToken}`,
+          ...authHeaders,
         },
       });
 
+      if (uploadId) {
+        await axios.post(`/api/reports/uploads/${uploadId}/complete/`, { report: response.data.id }, { headers: authHeaders });
+      }
+
       setMessage({ type: 'success', text: 'Report submitted successfully!' });
       // Navigate to the newly created report's detail page
       if (response.data && response.data.id) {
@@ -118,6 +174,7 @@ const SubmitReport = () => {
       }
     } finally {
       setLoading(false);
+      setUploadProgress(null);
     }
   };
 
@@ -324,7 +381,9 @@ const SubmitReport = () => {
                   {loading ? (
                     <>
                       <Loader2 className="animate-spin h-6 w-6 mr-3" />
-                      <span className="font-semibold text-lg">Submitting...</span>
+                      <span className="font-semibold text-lg">
+                        {uploadProgress !== null ? `Uploading evidence... ${uploadProgress}%` : 'Submitting...'}
+                      </span>
                     </>
                   ) : (
                     <>
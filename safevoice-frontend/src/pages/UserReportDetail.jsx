@@ -2,6 +2,7 @@
 import React, { useEffect, useState, useRef } from 'react';
 import { useParams } from 'react-router-dom';
 import axios from 'axios';
+import useCommentSync from '../components/useCommentSync';
 import { MessageSquare, Send, Loader2, Info, User as UserIcon, Shield, AlertCircle, Link, CheckCircle, XCircle, Clock, FileText } from 'lucide-react'; // Added FileText
 
 const UserReportDetail = () => {
@@ -68,6 +69,9 @@ const UserReportDetail = () => {
     fetchReportDetails();
   }, [reportId, accessToken]);
 
+  // New messages arrive through a long-poll instead of reloading the thread
+  useCommentSync(reportId, messages, setMessages, !loading && !error);
+
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   }, [messages]);
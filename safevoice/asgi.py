@@ -13,4 +13,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'safevoice.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after setup: it needs the app registry
+from reports.websocket import is_notification_socket, notifications_socket  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if is_notification_socket(scope):
+        return await notifications_socket(scope, receive, send)
+    if scope['type'] == 'websocket':
+        # Unknown socket path: refuse the handshake
+        await receive()
+        return await send({'type': 'websocket.close', 'code': 4404})
+    return await django_application(scope, receive, send)
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
+import tempfile
 import dj_database_url
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
     'reports',
     'encrypted_model_fields',
     'adminpanel',
+    'tasks',
       'rest_framework_simplejwt.token_blacklist',
       'corsheaders'
     
@@ -52,6 +54,8 @@ INSTALLED_APPS = [
 
 CORS_ALLOWED_ORIGINS = ['http://localhost:5173']
 CORS_ALLOW_CREDENTIALS = True
+# Read by the frontend's comment sync to tell a held long-poll from an immediate answer
+CORS_EXPOSE_HEADERS = ['X-Long-Poll']
 
 MIDDLEWARE = [
      'corsheaders.middleware.CorsMiddleware',
@@ -100,6 +104,15 @@ CLOUDINARY = {
 }
 
 FIELD_ENCRYPTION_KEY = config('FIELD_ENCRYPTION_KEY')
+
+# Bulk decryption of encrypted columns (reports/crypto.py). Batches of at least
+# BULK_DECRYPT_PROCESS_THRESHOLD tokens are fanned out to a process pool;
+# BULK_DECRYPT_WORKERS=0 means one worker per CPU.
+BULK_DECRYPT_PROCESS_THRESHOLD = config('BULK_DECRYPT_PROCESS_THRESHOLD', default=5000, cast=int)
+BULK_DECRYPT_WORKERS = config('BULK_DECRYPT_WORKERS', default=0, cast=int)
+BULK_DECRYPT_CHUNK_SIZE = config('BULK_DECRYPT_CHUNK_SIZE', default=1000, cast=int)
+BULK_DECRYPT_BATCH_SIZE = config('BULK_DECRYPT_BATCH_SIZE', default=20000, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -151,12 +164,132 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Cache (defaults to per-process local memory; point CACHE_BACKEND/CACHE_LOCATION
+# at a shared backend such as Redis or Memcached when running several workers).
+# Invalidation only reaches the process that made the change, so with the
+# default backend and several gunicorn workers other workers keep serving
+# stale entries (e.g. a by-token status or its file URL) for up to their TTL.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='safevoice'),
+    }
+}
+
+# Public by-token status lookups (reports/cache.py). Misses are cached briefly
+# so repeated guesses at random tokens don't reach the database.
+REPORT_TOKEN_CACHE_TTL = config('REPORT_TOKEN_CACHE_TTL', default=300, cast=int)
+REPORT_TOKEN_MISS_TTL = config('REPORT_TOKEN_MISS_TTL', default=30, cast=int)
+
+# Admin analytics payloads (reports/cache.py). Any change to the numbers retires
+# them, but they are served stale while one worker recomputes; the TTL bounds
+# how stale a per-process cache can get when nothing shares the version key.
+ANALYTICS_CACHE_TTL = config('ANALYTICS_CACHE_TTL', default=300, cast=int)
+ANALYTICS_CACHE_LOCK_TIMEOUT = config('ANALYTICS_CACHE_LOCK_TIMEOUT', default=30, cast=int)
+ANALYTICS_CACHE_WAIT = config('ANALYTICS_CACHE_WAIT', default=5, cast=float)
+
+# Keyset pagination for report listings (reports/pagination.py)
+REPORT_PAGE_SIZE = config('REPORT_PAGE_SIZE', default=25, cast=int)
+REPORT_MAX_PAGE_SIZE = config('REPORT_MAX_PAGE_SIZE', default=100, cast=int)
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 MEDIA_URL = config('MEDIA_URL', default='/media')
 MEDIA_ROOT = BASE_DIR / config('MEDIA_ROOT', default='media')
 
+# Evidence files are stored once per distinct content under
+# MEDIA_ROOT/<EVIDENCE_PREFIX>/<shards>/<sha256><ext> (reports/storage.py). The
+# shards are EVIDENCE_SHARD_DEPTH directories of EVIDENCE_SHARD_WIDTH hex digits
+# (2 x 2 -> evidence/ab/cd/abcd...). Layouts listed in EVIDENCE_LEGACY_SHARDS
+# ("<depth>x<width>,...") are still found until reshard_evidence moves them.
+EVIDENCE_PREFIX = config('EVIDENCE_PREFIX', default='evidence')
+EVIDENCE_SHARD_DEPTH = config('EVIDENCE_SHARD_DEPTH', default=2, cast=int)
+EVIDENCE_SHARD_WIDTH = config('EVIDENCE_SHARD_WIDTH', default=2, cast=int)
+EVIDENCE_LEGACY_SHARDS = config('EVIDENCE_LEGACY_SHARDS', default='1x2')
+
+# Image derivatives (reports/media.py): EXIF is stripped from originals and
+# WebP thumbnails / JPEG previews are rendered by the task worker (inline in
+# the request when EVIDENCE_PIPELINE_ASYNC is off).
+EVIDENCE_PIPELINE_ASYNC = config('EVIDENCE_PIPELINE_ASYNC', default=True, cast=bool)
+EVIDENCE_THUMBNAIL_SIZE = config('EVIDENCE_THUMBNAIL_SIZE', default=320, cast=int)
+EVIDENCE_PREVIEW_SIZE = config('EVIDENCE_PREVIEW_SIZE', default=1280, cast=int)
+# Videos are decoded with OpenCV in a child process that is killed after the timeout
+EVIDENCE_VIDEO_TIMEOUT = config('EVIDENCE_VIDEO_TIMEOUT', default=60, cast=int)
+EVIDENCE_VIDEO_SPRITE_FRAMES = config('EVIDENCE_VIDEO_SPRITE_FRAMES', default=16, cast=int)
+# PDFs are parsed with pypdf in a child process with a timeout and memory cap;
+# first-page text is skipped for documents longer than EVIDENCE_PDF_MAX_PAGES
+EVIDENCE_PDF_TIMEOUT = config('EVIDENCE_PDF_TIMEOUT', default=20, cast=int)
+EVIDENCE_PDF_MEMORY_MB = config('EVIDENCE_PDF_MEMORY_MB', default=512, cast=int)
+EVIDENCE_PDF_MAX_PAGES = config('EVIDENCE_PDF_MAX_PAGES', default=500, cast=int)
+
+# Evidence downloads (reports.views.EvidenceFileView) are streamed by Django
+# unless a front-end server takes over: set the header to 'X-Accel-Redirect'
+# (nginx, with an internal location at the prefix aliased to MEDIA_ROOT) or
+# 'X-Sendfile' (Apache/lighttpd, absolute path).
+EVIDENCE_ACCEL_REDIRECT_HEADER = config('EVIDENCE_ACCEL_REDIRECT_HEADER', default='')
+EVIDENCE_ACCEL_REDIRECT_PREFIX = config('EVIDENCE_ACCEL_REDIRECT_PREFIX', default='/protected-media/')
+# Seconds a signed ?access= link in evidence URLs stays valid; clients get
+# fresh links whenever they re-fetch the report.
+EVIDENCE_ACCESS_MAX_AGE = config('EVIDENCE_ACCESS_MAX_AGE', default=6 * 60 * 60, cast=int)
+
+# Resumable evidence uploads (reports.views.UploadSessionViewSet). Partial files
+# live outside MEDIA_ROOT until they are finalized and attached to a report.
+CHUNKED_UPLOAD_DIR = config('CHUNKED_UPLOAD_DIR', default=str(Path(tempfile.gettempdir()) / 'safevoice-uploads'))
+CHUNKED_UPLOAD_MAX_CHUNK_MB = config('CHUNKED_UPLOAD_MAX_CHUNK_MB', default=5, cast=float)
+CHUNKED_UPLOAD_EXPIRY_HOURS = config('CHUNKED_UPLOAD_EXPIRY_HOURS', default=24, cast=int)
+
+# Background tasks (tasks app), run by `manage.py runworker`. Failed tasks are
+# retried up to TASKS_MAX_ATTEMPTS times, TASKS_RETRY_BACKOFF seconds apart and
+# doubling each time; running tasks older than TASKS_LOCK_TIMEOUT are assumed
+# to have lost their worker. TASKS_EAGER runs them in-process after commit
+# instead, for development without a worker. Without either, emails are never
+# sent and uploaded evidence keeps its EXIF/GPS metadata.
+TASKS_EAGER = config('TASKS_EAGER', default=DEBUG, cast=bool)
+TASKS_WORKER_CONCURRENCY = config('TASKS_WORKER_CONCURRENCY', default=4, cast=int)
+TASKS_POLL_INTERVAL = config('TASKS_POLL_INTERVAL', default=1.0, cast=float)
+TASKS_MAX_ATTEMPTS = config('TASKS_MAX_ATTEMPTS', default=5, cast=int)
+TASKS_RETRY_BACKOFF = config('TASKS_RETRY_BACKOFF', default=30, cast=int)
+TASKS_RETRY_BACKOFF_MAX = config('TASKS_RETRY_BACKOFF_MAX', default=3600, cast=int)
+TASKS_LOCK_TIMEOUT = config('TASKS_LOCK_TIMEOUT', default=600, cast=int)
+TASKS_KEEP_FINISHED_DAYS = config('TASKS_KEEP_FINISHED_DAYS', default=7, cast=int)
+
+# Report status emails are coalesced per submitter: changes within
+# EMAIL_DIGEST_WINDOW seconds of the first pending one go out as one digest.
+# Digests are sent EMAIL_DIGEST_BATCH_SIZE at a time over one SMTP connection,
+# pausing EMAIL_DIGEST_BATCH_PAUSE seconds between batches for rate limits.
+EMAIL_DIGEST_WINDOW = config('EMAIL_DIGEST_WINDOW', default=300, cast=int)
+EMAIL_DIGEST_BATCH_SIZE = config('EMAIL_DIGEST_BATCH_SIZE', default=50, cast=int)
+EMAIL_DIGEST_BATCH_PAUSE = config('EMAIL_DIGEST_BATCH_PAUSE', default=0, cast=float)
+
+# Notification push (reports/websocket.py, served by the ASGI app). The fan-out
+# backend decides how a notification created on one node reaches sockets on
+# another: InProcessFanout when a single ASGI process serves everything,
+# PostgresFanout (LISTEN/NOTIFY on NOTIFICATION_FANOUT_CHANNEL) for several.
+NOTIFICATION_FANOUT_BACKEND = config('NOTIFICATION_FANOUT_BACKEND', default='reports.realtime.InProcessFanout')
+NOTIFICATION_FANOUT_CHANNEL = config('NOTIFICATION_FANOUT_CHANNEL', default='safevoice_notifications')
+# Pushes buffered per socket before a stalled client starts missing them
+NOTIFICATION_SOCKET_QUEUE_SIZE = config('NOTIFICATION_SOCKET_QUEUE_SIZE', default=100, cast=int)
+
+# Incremental comment sync (ReportCommentViewSet with ?after_id= / ?since=):
+# at most COMMENT_SYNC_PAGE_SIZE comments per response, and ?wait= holds the
+# request up to COMMENT_LONGPOLL_MAX_WAIT seconds for a new one, re-checking
+# the database every COMMENT_LONGPOLL_RECHECK seconds for other processes' writes.
+COMMENT_SYNC_PAGE_SIZE = config('COMMENT_SYNC_PAGE_SIZE', default=200, cast=int)
+COMMENT_LONGPOLL_MAX_WAIT = config('COMMENT_LONGPOLL_MAX_WAIT', default=10, cast=float)
+COMMENT_LONGPOLL_RECHECK = config('COMMENT_LONGPOLL_RECHECK', default=5, cast=float)
+# Requests allowed to wait at once per process; beyond that ?wait= is ignored.
+# Every waiter holds a worker thread, so leave this at 0 with gunicorn's sync
+# workers. To enable it run threaded workers (--worker-class gthread --threads N)
+# and keep it well below N. Serving through ASGI doesn't help: DRF views run
+# synchronously there too, on a shared thread.
+COMMENT_LONGPOLL_MAX_WAITERS = config('COMMENT_LONGPOLL_MAX_WAITERS', default=0, cast=int)
+# Batched threads (GET /api/reports/comments/?report_ids=...): latest
+# COMMENT_BATCH_LIMIT comments per report by default, for up to
+# COMMENT_BATCH_MAX_REPORTS reports per request.
+COMMENT_BATCH_LIMIT = config('COMMENT_BATCH_LIMIT', default=50, cast=int)
+COMMENT_BATCH_MAX_REPORTS = config('COMMENT_BATCH_MAX_REPORTS', default=50, cast=int)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
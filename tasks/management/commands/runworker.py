@@ -0,0 +1,83 @@
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from tasks import queue
+
+# How often the worker requeues tasks from dead workers and prunes old rows
+MAINTENANCE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background tasks from the task table. Each of the --concurrency "
+        "threads claims one due task at a time; failures are retried with "
+        "exponential backoff. Stop with SIGINT/SIGTERM: running tasks finish first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.TASKS_WORKER_CONCURRENCY,
+                            help='Number of tasks to run in parallel.')
+        parser.add_argument('--poll-interval', type=float, default=settings.TASKS_POLL_INTERVAL,
+                            help='Seconds an idle thread waits before looking for work again.')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no due tasks are left instead of waiting for more.')
+
+    def handle(self, *args, **options):
+        self.stopping = threading.Event()
+        self.verbosity = options['verbosity']
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.stopping.set())
+
+        self.maintain()
+        base_id = f"{socket.gethostname()}:{os.getpid()}"
+        threads = [
+            threading.Thread(
+                target=self.loop, args=(f"{base_id}:{i}", options['poll_interval'], options['burst']),
+                name=f'task-worker-{i}',
+            )
+            for i in range(max(options['concurrency'], 1))
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"Worker {base_id} running {len(threads)} thread(s).")
+
+        last_maintenance = time.monotonic()
+        while any(thread.is_alive() for thread in threads):
+            # Short joins keep the main thread responsive to signals
+            threads[0].join(timeout=1)
+            if time.monotonic() - last_maintenance >= MAINTENANCE_INTERVAL:
+                self.maintain()
+                last_maintenance = time.monotonic()
+        self.stdout.write("Worker stopped.")
+
+    def loop(self, worker_id, poll_interval, burst):
+        try:
+            while not self.stopping.is_set():
+                claimed = queue.claim(worker_id)
+                if not claimed:
+                    if burst:
+                        return
+                    self.stopping.wait(poll_interval)
+                    continue
+                for task in claimed:
+                    ok = queue.run(task)
+                    if self.verbosity > 1:
+                        self.stdout.write(f"{task.name} #{task.pk}: {'done' if ok else 'failed'}")
+                close_old_connections()
+        finally:
+            # Each thread has its own connection; don't leave it open on exit
+            connections.close_all()
+
+    def maintain(self):
+        requeued, failed = queue.requeue_stale()
+        pruned = queue.prune_finished()
+        if requeued or failed or pruned:
+            self.stdout.write(f"Requeued {requeued} stale task(s), failed {failed}, pruned {pruned} finished.")
+        close_old_connections()
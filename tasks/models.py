@@ -0,0 +1,48 @@
+# tasks/models.py
+
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    One queued call of a function registered with ``tasks.queue.task``.
+
+    Rows are inserted by ``enqueue`` inside the caller's transaction and
+    claimed by ``manage.py runworker`` with SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        indexes = [
+            # The claim query only ever looks at queued rows that are due
+            models.Index(fields=['run_at', 'id'], name='task_ready_idx', condition=Q(status='queued')),
+            models.Index(fields=['status', 'locked_at'], name='task_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} [{self.status}]"
@@ -0,0 +1,173 @@
+# tasks/queue.py
+
+import logging
+import random
+import traceback
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    """
+    Register a function as a background task.
+
+    The function stays directly callable; ``func.enqueue(*args, **kwargs)``
+    queues a call instead. Arguments are stored as JSON, so pass ids rather
+    than model instances. Tasks may run more than once (a worker can die
+    after the work but before recording it), so they should be idempotent.
+    """
+    if func is None:
+        return partial(task, name=name, max_attempts=max_attempts)
+
+    func.task_name = name or f"{func.__module__}.{func.__qualname__}"
+    func.max_attempts = max_attempts or settings.TASKS_MAX_ATTEMPTS
+    func.enqueue = partial(enqueue, func)
+    func.schedule = partial(schedule, func)
+    _registry[func.task_name] = func
+    return func
+
+
+def get_task(name):
+    if name not in _registry:
+        # Importing the module registers the task; the worker may not have yet
+        import_string(name)
+    if name not in _registry:
+        raise LookupError(f"{name} is not a registered task")
+    return _registry[name]
+
+
+def enqueue(func, *args, **kwargs):
+    """
+    Queue ``func(*args, **kwargs)`` and return the Task row.
+
+    The row is written in the current transaction, so the task only becomes
+    visible to workers if the surrounding work commits. With TASKS_EAGER the
+    call runs in-process once that transaction commits instead.
+    """
+    return schedule(func, None, *args, **kwargs)
+
+
+def schedule(func, run_at, *args, **kwargs):
+    """Like ``enqueue``, but not before ``run_at`` (None for now)."""
+    if settings.TASKS_EAGER:
+        transaction.on_commit(partial(_run_eagerly, func, args, kwargs))
+        return None
+    return Task.objects.create(
+        name=func.task_name, args=list(args), kwargs=kwargs, max_attempts=func.max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def is_queued(func):
+    """Whether a call of ``func`` is already waiting to run."""
+    return Task.objects.filter(name=func.task_name, status=Task.QUEUED).exists()
+
+
+def _run_eagerly(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Task %s failed", func.task_name)
+
+
+def claim(worker_id, limit=1):
+    """
+    Lock up to ``limit`` due tasks for ``worker_id`` and mark them running.
+
+    SKIP LOCKED lets concurrent workers pass over rows another worker is
+    claiming instead of queueing behind it. Backends without row locks
+    (SQLite) ignore the FOR UPDATE; the conditional update still guarantees
+    each task goes to one worker.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status=Task.QUEUED, run_at__lte=now)
+            .order_by('run_at', 'id')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Task.objects.filter(pk__in=ids, status=Task.QUEUED).update(
+            status=Task.RUNNING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1,
+        )
+    return list(Task.objects.filter(pk__in=ids, status=Task.RUNNING, locked_by=worker_id, locked_at=now))
+
+
+def run(task_row):
+    """Execute a claimed task and record the outcome, scheduling a retry on failure."""
+    try:
+        func = get_task(task_row.name)
+        func(*task_row.args, **task_row.kwargs)
+    except Exception:
+        logger.exception("Task %s (%s) failed on attempt %s", task_row.pk, task_row.name, task_row.attempts)
+        _record_failure(task_row, traceback.format_exc())
+        return False
+    _finish(task_row, status=Task.DONE, finished_at=timezone.now(), locked_by='')
+    return True
+
+
+def _finish(task_row, **fields):
+    """
+    Record the outcome of a run, unless the task has meanwhile been requeued
+    by ``requeue_stale`` (and possibly claimed by another worker), in which
+    case that run owns the row now.
+    """
+    updated = Task.objects.filter(
+        pk=task_row.pk, status=Task.RUNNING, locked_by=task_row.locked_by, locked_at=task_row.locked_at,
+    ).update(**fields)
+    if not updated:
+        logger.warning("Task %s (%s) was requeued while running; outcome not recorded", task_row.pk, task_row.name)
+    return bool(updated)
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter: TASKS_RETRY_BACKOFF, doubled per attempt, capped."""
+    delay = min(settings.TASKS_RETRY_BACKOFF * 2 ** max(attempts - 1, 0), settings.TASKS_RETRY_BACKOFF_MAX)
+    # Spread retries so a recovering SMTP server isn't hit by all of them at once
+    return timedelta(seconds=delay * random.uniform(0.9, 1.1))
+
+
+def _record_failure(task_row, error):
+    now = timezone.now()
+    fields = {'last_error': error[-5000:], 'locked_by': ''}
+    if task_row.attempts < task_row.max_attempts:
+        fields.update(status=Task.QUEUED, run_at=now + retry_delay(task_row.attempts))
+    else:
+        fields.update(status=Task.FAILED, finished_at=now)
+    _finish(task_row, **fields)
+
+
+def requeue_stale():
+    """
+    Put tasks whose worker disappeared mid-run back in the queue.
+
+    Anything running longer than TASKS_LOCK_TIMEOUT is assumed lost; the
+    attempt it used still counts towards max_attempts.
+    """
+    now = timezone.now()
+    stale = Task.objects.filter(status=Task.RUNNING, locked_at__lt=now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, finished_at=now, locked_by='', last_error='Worker lost while running the task',
+    )
+    requeued = stale.update(status=Task.QUEUED, run_at=now, locked_by='')
+    return requeued, failed
+
+
+def prune_finished():
+    """Delete completed tasks older than TASKS_KEEP_FINISHED_DAYS. Failed ones are kept for inspection."""
+    cutoff = timezone.now() - timedelta(days=settings.TASKS_KEEP_FINISHED_DAYS)
+    return Task.objects.filter(status=Task.DONE, finished_at__lt=cutoff).delete()[0]
@@ -0,0 +1,89 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import queue
+from .models import Task
+
+calls = []
+
+
+@queue.task(max_attempts=2)
+def record(value):
+    calls.append(value)
+
+
+@queue.task(max_attempts=2)
+def explode():
+    raise RuntimeError('boom')
+
+
+@override_settings(TASKS_EAGER=False, TASKS_RETRY_BACKOFF=30, TASKS_RETRY_BACKOFF_MAX=3600)
+class QueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claim(self):
+        due = record.enqueue(1)
+        record.schedule(timezone.now() + datetime.timedelta(hours=1), 2)
+        claimed = queue.claim('worker-a', limit=5)
+        self.assertEqual([task.pk for task in claimed], [due.pk])
+        self.assertEqual((claimed[0].status, claimed[0].locked_by, claimed[0].attempts), (Task.RUNNING, 'worker-a', 1))
+        # Already running: another worker gets nothing
+        self.assertEqual(queue.claim('worker-b'), [])
+        self.assertTrue(queue.run(claimed[0]))
+        self.assertEqual(calls, [1])
+        self.assertEqual(Task.objects.get(pk=due.pk).status, Task.DONE)
+
+    def test_retry_backoff(self):
+        self.assertAlmostEqual(queue.retry_delay(1).total_seconds(), 30, delta=3)
+        self.assertAlmostEqual(queue.retry_delay(3).total_seconds(), 120, delta=12)
+        self.assertAlmostEqual(queue.retry_delay(20).total_seconds(), 3600, delta=360)
+
+        task = explode.enqueue()
+        before = timezone.now()
+        self.assertFalse(queue.run(queue.claim('worker')[0]))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.locked_by), (Task.QUEUED, ''))
+        self.assertIn('boom', task.last_error)
+        self.assertGreaterEqual(task.run_at, before + datetime.timedelta(seconds=27))
+
+        Task.objects.filter(pk=task.pk).update(run_at=timezone.now())
+        self.assertFalse(queue.run(queue.claim('worker')[0]))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.FAILED, 2))
+        self.assertIsNotNone(task.finished_at)
+
+    def test_requeue_stale(self):
+        long_ago = timezone.now() - datetime.timedelta(hours=1)
+        lost = record.enqueue(1)
+        exhausted = record.enqueue(2)
+        claimed = queue.claim('worker-a', limit=2)
+        Task.objects.filter(pk=lost.pk).update(locked_at=long_ago)
+        Task.objects.filter(pk=exhausted.pk).update(locked_at=long_ago, attempts=2)
+
+        with override_settings(TASKS_LOCK_TIMEOUT=600):
+            self.assertEqual(queue.requeue_stale(), (1, 1))
+        self.assertEqual(Task.objects.get(pk=lost.pk).status, Task.QUEUED)
+        self.assertEqual(Task.objects.get(pk=exhausted.pk).status, Task.FAILED)
+
+        # The original worker finishing late must not overwrite the new claim
+        reclaimed = queue.claim('worker-b')[0]
+        with mock.patch.object(queue.logger, 'warning'):
+            self.assertTrue(queue.run(claimed[0]))
+        reclaimed.refresh_from_db()
+        self.assertEqual((reclaimed.status, reclaimed.locked_by), (Task.RUNNING, 'worker-b'))
+
+    def test_prune_finished(self):
+        old = timezone.now() - datetime.timedelta(days=30)
+        done = record.enqueue(1)
+        recent = record.enqueue(2)
+        failed = record.enqueue(3)
+        Task.objects.filter(pk=done.pk).update(status=Task.DONE, finished_at=old)
+        Task.objects.filter(pk=recent.pk).update(status=Task.DONE, finished_at=timezone.now())
+        Task.objects.filter(pk=failed.pk).update(status=Task.FAILED, finished_at=old)
+        with override_settings(TASKS_KEEP_FINISHED_DAYS=7):
+            self.assertEqual(queue.prune_finished(), 1)
+        self.assertEqual(set(Task.objects.values_list('pk', flat=True)), {recent.pk, failed.pk})